@@ -0,0 +1,183 @@
+import argparse
+import gc
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, Iterable, List
+
+import numpy as np
+
+from .enc_num import serialize, deserialize
+from .keygen import generate_abramov_keypair
+from .wire import pack, unpack
+
+BENCHMARK_BASE = 7
+DEFAULT_DEGREES = (8, 64, 512)
+DEFAULT_DIGITS = (1, 4, 16)
+DEFAULT_REPEAT = 7
+DEFAULT_WARMUP = 2
+DEFAULT_MIN_TIME = 0.01  # seconds a single sample should last at least
+DEFAULT_TOLERANCE = 0.1  # relative slowdown of the median reported as a regression
+DEFAULT_SEED = 20220601
+
+
+def _time(func: Callable, loops: int) -> float:
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        return time.perf_counter() - start
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+# After the warmup calls the loop count is doubled until one sample takes at
+# least min_time, then `repeat` samples are taken; stats are per call
+def measure(func: Callable, repeat: int = DEFAULT_REPEAT, warmup: int = DEFAULT_WARMUP,
+            min_time: float = DEFAULT_MIN_TIME) -> Dict[str, float]:
+    for _ in range(warmup):
+        func()
+
+    loops = 1
+    while _time(func, loops) < min_time and loops < 2 ** 20:
+        loops *= 2
+
+    samples = [_time(func, loops) / loops for _ in range(repeat)]
+    return {
+        "loops": loops,
+        "repeat": repeat,
+        "min": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.mean(samples),
+        "stdev": statistics.stdev(samples) if repeat > 1 else 0.0,
+    }
+
+
+def _cases(degrees: Iterable[int], digits: Iterable[int], seed: int) -> Dict[str, Callable]:
+    rng = random.Random(seed)
+    cases = {}
+    for degree in degrees:
+        cases[f"keygen[degree={degree}]"] = lambda degree=degree: generate_abramov_keypair(BENCHMARK_BASE, degree)
+        private_key, public_key = generate_abramov_keypair(BENCHMARK_BASE, degree)
+
+        for digit_count in digits:
+            low, high = BENCHMARK_BASE ** (digit_count - 1), BENCHMARK_BASE ** digit_count - 1
+            number1, number2 = rng.randint(low, high), rng.randint(low, high)
+            a, b = public_key.encrypt(number1), public_key.encrypt(number2)
+            serialized, packed = serialize(a), pack(a)
+
+            suffix = f"[degree={degree},digits={digit_count}]"
+            cases["encrypt" + suffix] = lambda number=number1, key=public_key: key.encrypt(number)
+            cases["decrypt" + suffix] = lambda a=a, key=private_key: key.decrypt(a)
+            cases["add" + suffix] = lambda a=a, b=b: a + b
+            cases["mul" + suffix] = lambda a=a, b=b: a * b
+            cases["div" + suffix] = lambda a=a, b=b: a / b
+            cases["serialize" + suffix] = lambda a=a: serialize(a)
+            cases["deserialize" + suffix] = lambda serialized=serialized: deserialize(serialized)
+            cases["pack" + suffix] = lambda a=a: pack(a)
+            cases["unpack" + suffix] = lambda packed=packed: unpack(packed)
+    return cases
+
+
+def run(degrees: Iterable[int] = DEFAULT_DEGREES, digits: Iterable[int] = DEFAULT_DIGITS,
+        repeat: int = DEFAULT_REPEAT, warmup: int = DEFAULT_WARMUP, min_time: float = DEFAULT_MIN_TIME,
+        seed: int = DEFAULT_SEED, only: str = None) -> dict:
+    degrees, digits = list(degrees), list(digits)
+    results = {}
+    # Huge float ciphertexts overflow on decryption; that is part of what is measured
+    with np.errstate(all="ignore"):
+        for name, func in _cases(degrees, digits, seed).items():
+            if only is None or name.startswith(only):
+                results[name] = measure(func, repeat, warmup, min_time)
+    return {
+        "metadata": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "degrees": degrees,
+            "digits": digits,
+            "repeat": repeat,
+            "warmup": warmup,
+            "min_time": min_time,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+# Benchmarks present in both reports are compared by their median time
+def compare(baseline: dict, current: dict, tolerance: float = DEFAULT_TOLERANCE) -> List[dict]:
+    comparisons = []
+    for name, stats in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        ratio = stats["median"] / baseline["results"][name]["median"]
+        comparisons.append({
+            "name": name,
+            "baseline": baseline["results"][name]["median"],
+            "current": stats["median"],
+            "ratio": ratio,
+            "regression": ratio > 1 + tolerance,
+        })
+    return comparisons
+
+
+def _print_comparisons(comparisons: List[dict]):
+    for comparison in comparisons:
+        flag = "REGRESSION" if comparison["regression"] else ""
+        print(f"{comparison['name']:<45} {comparison['baseline']:.3e}s -> {comparison['current']:.3e}s "
+              f"x{comparison['ratio']:.2f} {flag}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m homomorphic_polynomial_system.benchmark")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="measure and write a JSON report")
+    run_parser.add_argument("--output", "-o", default="benchmark.json")
+    run_parser.add_argument("--degrees", type=int, nargs="+", default=DEFAULT_DEGREES)
+    run_parser.add_argument("--digits", type=int, nargs="+", default=DEFAULT_DIGITS)
+    run_parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    run_parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    run_parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME)
+    run_parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    run_parser.add_argument("--only", help="run only benchmarks whose name starts with this prefix")
+    run_parser.add_argument("--baseline", help="compare the new report against this one")
+    run_parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+
+    compare_parser = commands.add_parser("compare", help="flag regressions between two JSON reports")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = run(args.degrees, args.digits, args.repeat, args.warmup, args.min_time, args.seed, args.only)
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+        if args.baseline is None:
+            return 0
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        current = report
+    else:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        with open(args.current) as file:
+            current = json.load(file)
+
+    comparisons = compare(baseline, current, args.tolerance)
+    _print_comparisons(comparisons)
+    return 1 if any(comparison["regression"] for comparison in comparisons) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
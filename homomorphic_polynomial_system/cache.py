@@ -0,0 +1,90 @@
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+import numpy as np
+
+from .vars import *
+
+
+# Bounded LRU map from plaintexts to ciphertext coefficients. Stored arrays are
+# made read-only, so every EncryptedNumber built on top of one shares it safely:
+# in-place operators copy a read-only buffer before writing (copy-on-write)
+class EncryptionCache:
+    def __init__(self, max_entries: int = None, max_bytes: int = None):
+        if max_entries is None and max_bytes is None:
+            max_entries = ENCRYPTION_CACHE_MAX_ENTRIES
+        if max_entries is not None and max_entries < 0 or max_bytes is not None and max_bytes < 0:
+            raise ValueError("Cache bounds must not be negative")
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    # Locks cannot be pickled, e.g. when a public key is sent to worker processes
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable):
+        return key in self._entries
+
+    def get(self, key: Hashable) -> Optional[np.ndarray]:
+        with self._lock:
+            coefficients = self._entries.get(key)
+            if coefficients is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return coefficients
+
+    def put(self, key: Hashable, coefficients: np.ndarray) -> np.ndarray:
+        coefficients = np.array(coefficients, dtype=np.float64)
+        coefficients.flags.writeable = False
+        if self._max_bytes is not None and coefficients.nbytes > self._max_bytes:
+            return coefficients
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._entries[key] = coefficients
+            self._bytes += coefficients.nbytes
+            self._evict()
+        return coefficients
+
+    def _evict(self):
+        while self._entries and (self._max_entries is not None and len(self._entries) > self._max_entries or
+                                 self._max_bytes is not None and self._bytes > self._max_bytes):
+            _, coefficients = self._entries.popitem(last=False)
+            self._bytes -= coefficients.nbytes
+            self._evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
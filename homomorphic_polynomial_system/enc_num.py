@@ -1,57 +1,253 @@
 import base64
+import numbers
 
 import numpy as np
 
-from .utils import is_zero, is_number
+from .instrumentation import instrumented
+from .polymath import multiply, divide
 
 
+# Coefficients live in a contiguous float64 buffer in ascending degree order;
+# only the first `_length` entries are used and the rest is kept at zero, so
+# in-place operators can grow into the spare capacity without reallocating
 class EncryptedNumber:
-    def __init__(self, polynomial: np.poly1d):
-        self.polynomial = polynomial
+    __slots__ = ("_buffer", "_length", "reducer")
+
+    def __init__(self, polynomial: np.poly1d = None, reducer=None):
+        coefficients = np.zeros(1) if polynomial is None else np.poly1d(polynomial).coef[::-1]
+        self._set(np.array(coefficients, dtype=np.float64))
+        self.reducer = reducer
+
+    @classmethod
+    def from_coefficients(cls, coefficients: np.ndarray, reducer=None, copy: bool = True) -> "EncryptedNumber":
+        encrypted_number = cls.__new__(cls)
+        if copy:
+            coefficients = np.array(coefficients, dtype=np.float64)
+        else:
+            coefficients = np.ascontiguousarray(coefficients, dtype=np.float64)
+        encrypted_number._set(coefficients)
+        encrypted_number.reducer = reducer
+        return encrypted_number
+
+    def _set(self, buffer: np.ndarray):
+        self._buffer = buffer
+        self._length = _trimmed_length(buffer)
+
+    @property
+    def coefficients(self) -> np.ndarray:
+        return self._buffer[:self._length]
+
+    @property
+    def polynomial(self) -> np.poly1d:
+        return np.poly1d(self.coefficients[::-1])
+
+    @polynomial.setter
+    def polynomial(self, polynomial: np.poly1d):
+        self._set(np.array(np.poly1d(polynomial).coef[::-1], dtype=np.float64))
+
+    @property
+    def degree(self) -> int:
+        return self._length - 1
+
+    def capacity(self) -> int:
+        return len(self._buffer)
 
     def __str__(self):
         return self.polynomial.__str__()
 
+    def _wrap(self, coefficients: np.ndarray, reducer=None) -> "EncryptedNumber":
+        reducer = self.reducer if self.reducer is not None else reducer
+        if reducer is not None:
+            coefficients = reducer.apply_coefficients(coefficients)
+        return EncryptedNumber.from_coefficients(coefficients, reducer, copy=False)
+
+    # The buffer (and its spare capacity) is only replaced when the policy reduces
+    def _apply_reducer(self):
+        if self.reducer is not None and self.reducer.should_reduce(self.degree):
+            coefficients = self.coefficients
+            reduced = self.reducer.apply_coefficients(coefficients)
+            if reduced is not coefficients:
+                self._set(np.array(reduced))
+
+    # Makes room for `length` coefficients, over-allocating so that long
+    # accumulation loops only reallocate a logarithmic number of times; read-only
+    # (shared) buffers are copied first
+    def _reserve(self, length: int):
+        if length <= len(self._buffer) and self._buffer.flags.writeable:
+            return
+        capacity = max(length, 2 * len(self._buffer)) if length > len(self._buffer) else len(self._buffer)
+        buffer = np.zeros(capacity)
+        buffer[:self._length] = self.coefficients
+        self._buffer = buffer
+
+    # Plaintext integers need no encryption: decryption evaluates the polynomial
+    # at the secret root, so a scalar added to the constant term is added to the
+    # plaintext and scaling all coefficients scales the plaintext
+    @instrumented("add")
     def __add__(self, other):
-        result = EncryptedNumber(self.polynomial + other.polynomial)
+        coefficients, reducer = _operand(other)
+        if coefficients is None:
+            return NotImplemented
+        result = self._wrap(_add(self.coefficients, coefficients, 1), reducer)
         return result
 
+    __radd__ = __add__
+
+    @instrumented("mul")
     def __mul__(self, other):
-        result = EncryptedNumber(self.polynomial * other.polynomial)
+        if isinstance(other, numbers.Integral):
+            return self._wrap(self.coefficients * float(other))
+        coefficients, reducer = _operand(other)
+        if coefficients is None:
+            return NotImplemented
+        result = self._wrap(multiply(self.coefficients, coefficients), reducer)
         return result
 
+    __rmul__ = __mul__
+
+    @instrumented("sub")
     def __sub__(self, other):
-        result = EncryptedNumber(self.polynomial - other.polynomial)
+        coefficients, reducer = _operand(other)
+        if coefficients is None:
+            return NotImplemented
+        result = self._wrap(_add(self.coefficients, coefficients, -1), reducer)
         return result
 
+    @instrumented("sub")
+    def __rsub__(self, other):
+        coefficients, reducer = _operand(other)
+        if coefficients is None:
+            return NotImplemented
+        return self._wrap(_add(coefficients, self.coefficients, -1), reducer)
+
+    def __neg__(self):
+        return self._wrap(-self.coefficients)
+
+    def _accumulate(self, other, sign: int):
+        coefficients, reducer = _operand(other)
+        if coefficients is None:
+            return NotImplemented
+        length = max(self._length, len(coefficients))
+        self._reserve(length)
+        if sign > 0:
+            self._buffer[:len(coefficients)] += coefficients
+        else:
+            self._buffer[:len(coefficients)] -= coefficients
+        self._length = _trimmed_length(self._buffer[:length])
+        if self.reducer is None:
+            self.reducer = reducer
+        self._apply_reducer()
+        return self
+
+    @instrumented("iadd")
+    def __iadd__(self, other):
+        return self._accumulate(other, 1)
+
+    @instrumented("isub")
+    def __isub__(self, other):
+        return self._accumulate(other, -1)
+
+    @instrumented("imul")
+    def __imul__(self, other):
+        if isinstance(other, numbers.Integral):
+            self._reserve(self._length)
+            self._buffer[:self._length] *= float(other)
+            self._length = _trimmed_length(self._buffer[:self._length])
+            return self
+        coefficients, reducer = _operand(other)
+        if coefficients is None:
+            return NotImplemented
+        product = multiply(self.coefficients, coefficients)
+        self._reserve(len(product))
+        self._buffer[:len(product)] = product
+        self._buffer[len(product):] = 0
+        self._length = _trimmed_length(product)
+        if self.reducer is None:
+            self.reducer = reducer
+        self._apply_reducer()
+        return self
+
+    @instrumented("div")
     def __truediv__(self, other):
-        if is_zero(other.polynomial):
-            raise ZeroDivisionError()
+        if not isinstance(other, EncryptedNumber):
+            return NotImplemented
+        whole_part, remains = self._divmod(other)
 
-        enc_q, enc_r = self.polynomial / other.polynomial
-
-        if is_number(self.polynomial) and is_number(other.polynomial):
-            result = EncryptedNumber(enc_q)
+        if self.degree == 0 and other.degree == 0:
             zero = EncryptedNumber(np.poly1d(0))
             one = EncryptedNumber(np.poly1d(1))
-            return result, zero, one
-
-        whole_part = EncryptedNumber(enc_q)
-        remains = EncryptedNumber(enc_r)
+            return whole_part, zero, one
 
         return whole_part, remains, other
 
+    @instrumented("divmod")
+    def __divmod__(self, other):
+        if not isinstance(other, EncryptedNumber):
+            return NotImplemented
+        return self._divmod(other)
+
+    # Shared by / and divmod(), so each of them is counted once by the instrumentation
+    def _divmod(self, other: "EncryptedNumber"):
+        if other.degree == 0 and other.coefficients[0] == 0:
+            raise ZeroDivisionError()
+
+        enc_q, enc_r = divide(self.coefficients[::-1], other.coefficients[::-1])
+
+        whole_part = self._wrap(enc_q[::-1], other.reducer)
+        remains = self._wrap(enc_r[::-1], other.reducer)
+
+        return whole_part, remains
+
+    # Degree reduction modulo the public key polynomial, see reduction.Reducer
+    @instrumented("reduce")
+    def reduce(self) -> "EncryptedNumber":
+        if self.reducer is None:
+            raise ValueError("Encrypted number has no reducer, encrypt it with a reducing public key")
+        return EncryptedNumber.from_coefficients(self.reducer.reduce_coefficients(self.coefficients), self.reducer)
+
+
+# Plaintext integers act as constant polynomials
+def _operand(other):
+    if isinstance(other, EncryptedNumber):
+        return other.coefficients, other.reducer
+    if isinstance(other, numbers.Integral):
+        return np.array([float(other)]), None
+    return None, None
+
+
+def _trimmed_length(coefficients: np.ndarray) -> int:
+    if len(coefficients) and coefficients[-1] != 0:
+        return len(coefficients)
+    nonzero = np.flatnonzero(coefficients)
+    return int(nonzero[-1]) + 1 if len(nonzero) else 1
+
+
+def _add(a: np.ndarray, b: np.ndarray, sign: int) -> np.ndarray:
+    result = np.zeros(max(len(a), len(b)))
+    result[:len(a)] = a
+    if sign > 0:
+        result[:len(b)] += b
+    else:
+        result[:len(b)] -= b
+    return result
+
 
+# Serialized ciphertexts are base64 wire-format buffers, so their coefficients
+# use the narrowest exact dtype (see wire.compact_dtype); strings in the former
+# raw float64 layout are still accepted by deserialize
 def serialize(encrypted_number: EncryptedNumber) -> str:
-    ndarray_representation = np.array([encrypted_number.polynomial.coef])
-    bytes_representation = base64.b64encode(ndarray_representation)
+    from . import wire  # wire builds on this module
+    bytes_representation = base64.b64encode(wire.pack(encrypted_number))
     serialized_obj = bytes_representation.decode()
     return serialized_obj
 
 
 def deserialize(serialized_obj: str) -> EncryptedNumber:
-    bytes_representation = serialized_obj.encode()
-    ndarray_representation = np.frombuffer(base64.decodebytes(bytes_representation), dtype=np.float64)
+    from . import wire  # wire builds on this module
+    bytes_representation = base64.decodebytes(serialized_obj.encode())
+    if bytes_representation[:len(wire.MAGIC)] == wire.MAGIC and len(bytes_representation) >= wire.HEADER_SIZE:
+        return wire.unpack(bytes_representation)[0]
+    ndarray_representation = np.frombuffer(bytes_representation, dtype=np.float64)
     ndarray_representation1d = np.squeeze(ndarray_representation)
     polynomial = np.poly1d(ndarray_representation1d)
     return EncryptedNumber(polynomial)
@@ -0,0 +1,81 @@
+from typing import List
+
+import numpy as np
+
+from .enc_num import EncryptedNumber
+from .polymath import multiply_batch
+from .utils import trim_leading_zeros
+
+
+# Many ciphertexts stored as one matrix: every row holds the coefficients of one
+# polynomial in poly1d (descending) order, right-aligned and padded with leading zeros.
+# The matrix may use a compact integer dtype (see wire.compact_dtype); arithmetic
+# results are always float64
+class EncryptedVector:
+    def __init__(self, coefficients: np.ndarray):
+        coefficients = np.asarray(coefficients)
+        if coefficients.ndim != 2:
+            raise ValueError("Coefficients must be a 2-D array")
+        self.coefficients = coefficients
+
+    @classmethod
+    def from_list(cls, encrypted_numbers: List[EncryptedNumber]) -> "EncryptedVector":
+        width = max((len(number.coefficients) for number in encrypted_numbers), default=1)
+        coefficients = np.zeros((len(encrypted_numbers), width))
+        for row, number in zip(coefficients, encrypted_numbers):
+            row[width - len(number.coefficients):] = number.coefficients[::-1]
+        return cls(coefficients)
+
+    def to_list(self) -> List[EncryptedNumber]:
+        return [EncryptedNumber.from_coefficients(row[::-1]) for row in self.coefficients]
+
+    def __len__(self):
+        return self.coefficients.shape[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return EncryptedVector(self.coefficients[index])
+        return EncryptedNumber.from_coefficients(self.coefficients[index][::-1])
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __str__(self):
+        return "\n\n".join(str(number) for number in self.to_list())
+
+    def get_width(self):
+        return self.coefficients.shape[1]
+
+    def __add__(self, other):
+        a, b = _align(self, other)
+        return EncryptedVector(trim_leading_zeros(a + b))
+
+    def __sub__(self, other):
+        a, b = _align(self, other)
+        return EncryptedVector(trim_leading_zeros(a - b))
+
+    def __mul__(self, other):
+        _check_lengths(self, other)
+        return EncryptedVector(trim_leading_zeros(multiply_batch(self.coefficients, other.coefficients)))
+
+    def sum(self) -> EncryptedNumber:
+        return EncryptedNumber.from_coefficients(self.coefficients.sum(axis=0, dtype=np.float64)[::-1], copy=False)
+
+
+def _check_lengths(a: EncryptedVector, b: EncryptedVector):
+    if len(a) != len(b):
+        raise ValueError(f"Vectors have different lengths: {len(a)} and {len(b)}")
+
+
+def _pad(coefficients: np.ndarray, width: int) -> np.ndarray:
+    coefficients = coefficients.astype(np.float64, copy=False)
+    if coefficients.shape[1] == width:
+        return coefficients
+    return np.pad(coefficients, ((0, 0), (width - coefficients.shape[1], 0)))
+
+
+def _align(a: EncryptedVector, b: EncryptedVector):
+    _check_lengths(a, b)
+    width = max(a.get_width(), b.get_width())
+    return _pad(a.coefficients, width), _pad(b.coefficients, width)
+
@@ -0,0 +1,84 @@
+import numbers
+from typing import Dict, Sequence, Union
+
+import numpy as np
+
+from .enc_num import EncryptedNumber
+
+
+# Powers of one ciphertext, built on demand from the two halves of the exponent
+# so x ** n costs a single multiplication once the lower powers exist; keep the
+# cache around to evaluate several polynomials on the same input
+class PowerCache:
+    def __init__(self, encrypted_number: EncryptedNumber):
+        self._powers: Dict[int, EncryptedNumber] = {1: encrypted_number}
+
+    def get_base(self) -> EncryptedNumber:
+        return self._powers[1]
+
+    def get(self, exponent: int) -> EncryptedNumber:
+        if exponent < 0:
+            raise ValueError(f"Negative exponent: {exponent}")
+        if exponent == 0:
+            return EncryptedNumber.from_coefficients([1.0], self.get_base().reducer)
+        if exponent not in self._powers:
+            half = exponent // 2
+            self._powers[exponent] = self.get(exponent - half) * self.get(half)
+        return self._powers[exponent]
+
+    def __len__(self):
+        return len(self._powers)
+
+
+def _coefficients(coeffs) -> list:
+    if isinstance(coeffs, np.poly1d):
+        coeffs = coeffs.coef[::-1]
+    if any(not isinstance(c, numbers.Real) for c in coeffs):
+        raise TypeError("Polynomial coefficients must be real numbers")
+    coeffs = [float(c) for c in coeffs]
+    while len(coeffs) > 1 and coeffs[-1] == 0:
+        coeffs.pop()
+    return coeffs or [0]
+
+
+# Block size with the fewest ciphertext multiplications: x ** 2 .. x ** (k - 1)
+# for the baby steps, then x ** k and one Horner step per extra block
+def _block_size(length: int) -> int:
+    def cost(step: int) -> int:
+        block_count = -(-length // step)
+        return max(0, step - 2) + (block_count if block_count > 1 else 0)
+
+    return min(range(1, length + 1), key=lambda step: (cost(step), -step))
+
+
+# Paterson-Stockmeyer: with k ~ sqrt(n) the polynomial is split into blocks
+# q_j of degree below k, p(x) = sum q_j(x) * (x ** k) ** j. Blocks only combine
+# the baby steps x ** 0 .. x ** (k - 1) with plaintext scalars, all of them in
+# one matrix product, and Horner's scheme in x ** k joins them, so the whole
+# evaluation takes about 2 * sqrt(n) ciphertext multiplications instead of n.
+# Coefficients are real numbers in ascending order (c0 + c1 * x + ...), or a poly1d
+def evaluate_polynomial(encrypted_number: Union[EncryptedNumber, PowerCache],
+                        coeffs: Union[Sequence[float], np.poly1d]) -> EncryptedNumber:
+    powers = encrypted_number if isinstance(encrypted_number, PowerCache) else PowerCache(encrypted_number)
+    coeffs = _coefficients(coeffs)
+    step = _block_size(len(coeffs))
+
+    baby_steps = [powers.get(exponent).coefficients for exponent in range(step)]
+    width = max(len(power) for power in baby_steps)
+    baby_matrix = np.zeros((step, width))
+    for row, power in zip(baby_matrix, baby_steps):
+        row[:len(power)] = power
+
+    block_count = -(-len(coeffs) // step)
+    block_matrix = np.zeros((block_count, step))
+    block_matrix.flat[:len(coeffs)] = coeffs
+    blocks = block_matrix @ baby_matrix
+
+    reducer = powers.get_base().reducer
+    result = EncryptedNumber.from_coefficients(blocks[-1], reducer, copy=False)
+    if block_count > 1:
+        giant_step = powers.get(step)
+        for block in blocks[-2::-1]:
+            result *= giant_step
+            result += EncryptedNumber.from_coefficients(block, reducer, copy=False)
+    return result
@@ -0,0 +1,127 @@
+import functools
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List
+
+import numpy as np
+
+
+class OperationStats:
+    __slots__ = ("count", "total_time", "max_operand_degree", "max_result_degree", "max_coefficient")
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.max_operand_degree = -1
+        self.max_result_degree = -1
+        self.max_coefficient = 0.0
+
+    def as_dict(self) -> dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class _State:
+    enabled = False
+    stats: Dict[str, OperationStats] = {}
+    hooks: List[Callable[[dict], None]] = []
+
+
+def _degree(value) -> int:
+    if hasattr(value, "coefficients"):
+        return int(np.shape(value.coefficients)[-1]) - 1
+    return -1
+
+
+def _max_coefficient(value) -> float:
+    if isinstance(value, tuple):
+        return max((_max_coefficient(item) for item in value), default=0.0)
+    if not hasattr(value, "coefficients"):
+        return 0.0
+    coefficients = value.coefficients
+    return float(np.max(np.abs(coefficients))) if np.size(coefficients) else 0.0
+
+
+def _result_degree(value) -> int:
+    if isinstance(value, tuple):
+        return max((_degree(item) for item in value), default=-1)
+    return _degree(value)
+
+
+def _record(name: str, duration: float, args: tuple, result):
+    operand_degree = max((_degree(arg) for arg in args), default=-1)
+    result_degree = _result_degree(result)
+    max_coefficient = _max_coefficient(result)
+
+    stats = _State.stats.get(name)
+    if stats is None:
+        stats = _State.stats[name] = OperationStats()
+    stats.count += 1
+    stats.total_time += duration
+    stats.max_operand_degree = max(stats.max_operand_degree, operand_degree)
+    stats.max_result_degree = max(stats.max_result_degree, result_degree)
+    stats.max_coefficient = max(stats.max_coefficient, max_coefficient)
+
+    if _State.hooks:
+        event = {"operation": name, "duration": duration, "operand_degree": operand_degree,
+                 "result_degree": result_degree, "max_coefficient": max_coefficient}
+        for hook in _State.hooks:
+            hook(event)
+
+
+# When instrumentation is off the wrapper costs one attribute check per call
+def instrumented(name: str):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _State.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            result = func(*args, **kwargs)
+            _record(name, time.perf_counter() - start, args, result)
+            return result
+        return wrapper
+    return decorator
+
+
+def enable():
+    _State.enabled = True
+
+
+def disable():
+    _State.enabled = False
+
+
+def is_enabled() -> bool:
+    return _State.enabled
+
+
+def reset():
+    _State.stats.clear()
+
+
+def snapshot() -> Dict[str, dict]:
+    return {name: stats.as_dict() for name, stats in _State.stats.items()}
+
+
+# Hooks receive one event dict per instrumented call, e.g. to forward it to a metrics pipeline
+def add_hook(hook: Callable[[dict], None]):
+    _State.hooks.append(hook)
+
+
+def remove_hook(hook: Callable[[dict], None]):
+    _State.hooks.remove(hook)
+
+
+@contextmanager
+def recording(hook: Callable[[dict], None] = None):
+    was_enabled = _State.enabled
+    reset()
+    if hook is not None:
+        add_hook(hook)
+    enable()
+    try:
+        yield snapshot
+    finally:
+        _State.enabled = was_enabled
+        if hook is not None:
+            remove_hook(hook)
@@ -1,51 +1,205 @@
-from typing import Tuple
+from typing import Iterable, List, Tuple, Union
 import secrets
+import struct
 import numpy as np
 
+from .cache import EncryptionCache
 from .enc_num import EncryptedNumber
-from .utils import generate_obfuscating_multiplier
+from .enc_vec import EncryptedVector
+from .instrumentation import instrumented
+from .polymath import product_tree
+from .reduction import Reducer
+from .sparse import SparsePolynomial, multiply, to_dense, densify_if_filled, sparsify_if_empty, \
+    add_constant, evaluate, generate_sparse_obfuscating_multiplier
+from .utils import trim_leading_zeros, to_digits
 from .vars import *
 
+# magic, version, kind, base, number of float64 values that follow, reserved
+KEY_HEADER_FORMAT = "<4sBB2xQQQ"
+KEY_HEADER_SIZE = struct.calcsize(KEY_HEADER_FORMAT)
+KEY_MAGIC = b"HPSK"
+KEY_VERSION = 1
+
+PRIVATE_KEY = 0
+PUBLIC_KEY = 1
+
+
+def _write_key_file(path: str, kind: int, base: int, values: np.ndarray):
+    values = np.ascontiguousarray(values, dtype="<f8")
+    with open(path, "wb") as file:
+        file.write(struct.pack(KEY_HEADER_FORMAT, KEY_MAGIC, KEY_VERSION, kind, base, len(values), 0))
+        file.write(values.tobytes())
+
+
+def _read_key_file(path: str, kind: int, mmap: bool = True) -> Tuple[int, np.ndarray]:
+    with open(path, "rb") as file:
+        magic, version, file_kind, base, length, _ = struct.unpack(KEY_HEADER_FORMAT, file.read(KEY_HEADER_SIZE))
+        if magic != KEY_MAGIC or file_kind != kind:
+            raise ValueError(f"{path} does not hold a {'public' if kind == PUBLIC_KEY else 'private'} key")
+        if version > KEY_VERSION:
+            raise ValueError(f"Unsupported key file version: {version}")
+        if not mmap:
+            return base, np.frombuffer(file.read(8 * length), dtype="<f8").copy()
+    return base, np.memmap(path, dtype="<f8", mode="r", offset=KEY_HEADER_SIZE, shape=(length,))
+
 
 class AbramovPrivateKey:
     def __init__(self, root: float):
         self._root = root
+        self._root_powers = np.ones(1)
 
+    @instrumented("decrypt")
     def decrypt(self, encrypted_number: EncryptedNumber) -> float:
-        decrypted_number = np.polyval(encrypted_number.polynomial, self._root)
+        decrypted_number = np.polyval(encrypted_number.coefficients[::-1], self._root)
         return float(decrypted_number)
 
+    # Ascending powers of the root, extended whenever a wider ciphertext shows up
+    def get_root_powers(self, width: int) -> np.ndarray:
+        cached_width = len(self._root_powers)
+        if width > cached_width:
+            extension = self._root_powers[-1] * self._root ** np.arange(1, width - cached_width + 1)
+            self._root_powers = np.concatenate([self._root_powers, extension])
+        return self._root_powers[:width]
+
+    @instrumented("decrypt_many")
+    def decrypt_many(self, encrypted_numbers: Union[EncryptedVector, List[EncryptedNumber], np.ndarray],
+                     as_array: bool = False) -> Union[List[float], np.ndarray]:
+        if isinstance(encrypted_numbers, EncryptedVector):
+            coefficients = encrypted_numbers.coefficients
+        elif isinstance(encrypted_numbers, np.ndarray):
+            coefficients = encrypted_numbers
+        else:
+            coefficients = EncryptedVector.from_list(list(encrypted_numbers)).coefficients
+
+        # Rows are in descending order, so the last column pairs with root ** 0
+        root_powers = self.get_root_powers(coefficients.shape[1])[::-1]
+        decrypted_numbers = coefficients @ root_powers
+
+        if as_array:
+            return decrypted_numbers
+        return decrypted_numbers.tolist()
+
     def get_root(self):
         return self._root
 
+    def save(self, path: str):
+        _write_key_file(path, PRIVATE_KEY, 0, np.array([self._root]))
+
+    @classmethod
+    def load(cls, path: str) -> "AbramovPrivateKey":
+        _, values = _read_key_file(path, PRIVATE_KEY, mmap=False)
+        return cls(float(values[0]))
 
+
+# The key is kept sparse as long as it fills at most SPARSE_FILL_THRESHOLD of its
+# coefficients: encryption and key powers then run on its nonzero terms only
 class AbramovPublicKey:
-    def __init__(self, base: int, key_polynomial: np.poly1d):
+    # Only one form of the key is kept: sparse while it is mostly zeros, dense
+    # (possibly a memory-mapped view) otherwise; poly1d is built on demand
+    def __init__(self, base: int, key_polynomial: Union[np.poly1d, SparsePolynomial]):
         self._base = base
-        self._key_polynomial = key_polynomial
+        if isinstance(key_polynomial, SparsePolynomial):
+            self._key = densify_if_filled(key_polynomial)
+        else:
+            self._key = sparsify_if_empty(key_polynomial.coef)
+        self._key_powers = np.ones((1, 1))
+        self._reducer = None
+        self._cache = None
 
     def encode(self, number: int) -> np.poly1d:
-        in_new_numbering_system = np.base_repr(number, self._base)
-        polynomial_representation = np.poly1d([int(digit) for digit in str(in_new_numbering_system)])
+        digits = to_digits([number], self._base)[0]
+        polynomial_representation = np.poly1d(digits[::-1])
         return polynomial_representation
 
+    @instrumented("encrypt")
     def encrypt(self, number: int) -> EncryptedNumber:
-        encoded_number = self.encode(int(number))
-        encrypted_number_to_wrap = np.polyval(encoded_number, self._key_polynomial)
-        encrypted_number = EncryptedNumber(encrypted_number_to_wrap)
+        number = int(number)
+        if self._cache is not None:
+            return self._encrypt_cached(number)
+        encrypted_number = EncryptedNumber.from_coefficients(self._encrypt_coefficients(number), self._reducer)
         return encrypted_number
 
+    # Ascending ciphertext coefficients: the encoded number evaluated at the key
+    def _encrypt_coefficients(self, number: int) -> np.ndarray:
+        return to_dense(evaluate(self.encode(number).coef, self._key))[::-1]
+
+    # Cached coefficients are read-only and shared by all ciphertexts of the same
+    # number; in-place operators copy them before the first write
+    def _encrypt_cached(self, number: int) -> EncryptedNumber:
+        coefficients = self._cache.get(number)
+        if coefficients is None:
+            coefficients = self._cache.put(number, self._encrypt_coefficients(number))
+        return EncryptedNumber.from_coefficients(coefficients, self._reducer, copy=False)
+
+    # Encryption is deterministic, so repeated plaintexts can be served from an LRU cache
+    def enable_cache(self, max_entries: int = None, max_bytes: int = None) -> EncryptionCache:
+        self._cache = EncryptionCache(max_entries, max_bytes)
+        return self._cache
+
+    def disable_cache(self):
+        self._cache = None
+
+    def get_cache(self) -> EncryptionCache:
+        return self._cache
+
+    def get_reducer(self, policy: str = REDUCE_MANUALLY, threshold: int = None) -> Reducer:
+        modulus = to_dense(add_constant(self._key, -self._base))
+        return Reducer(modulus, policy, threshold)
+
+    # Ciphertexts encrypted from now on carry the reducer and reduce according to its policy
+    def set_reduction_policy(self, policy: str = REDUCE_MANUALLY, threshold: int = None):
+        self._reducer = self.get_reducer(policy, threshold)
+
+    # Row i holds key_polynomial ** i, right-aligned to the width of the highest power
+    def get_key_powers(self, digit_count: int) -> np.ndarray:
+        cached_count = self._key_powers.shape[0]
+        if digit_count > cached_count:
+            key = self._key
+            powers = [trim_leading_zeros(row) for row in self._key_powers]
+            while len(powers) < digit_count:
+                powers.append(to_dense(multiply(powers[-1], key)))
+            width = len(powers[-1])
+            key_powers = np.zeros((digit_count, width))
+            for row, power in zip(key_powers, powers):
+                row[width - len(power):] = power
+            self._key_powers = key_powers
+        return self._key_powers[:max(digit_count, 1)]
+
+    # Row i holds the ascending digits of the i-th number, see utils.to_digits
+    def encode_many(self, numbers: Union[Iterable[int], np.ndarray]) -> np.ndarray:
+        return to_digits(numbers, self._base)
+
+    # Column i of the digit matrix multiplies key_polynomial ** i, so a whole
+    # batch is encrypted by a single matrix product instead of Horner's scheme
+    @instrumented("encrypt_many")
+    def encrypt_many(self, numbers: Union[Iterable[int], np.ndarray]) -> EncryptedVector:
+        digit_matrix = self.encode_many(numbers)
+        key_powers = self.get_key_powers(digit_matrix.shape[1])
+        return EncryptedVector(trim_leading_zeros(digit_matrix @ key_powers))
+
     def get_base(self):
         return self._base
 
-    def get_polynomial(self):
-        return self._key_polynomial
+    def get_polynomial(self) -> np.poly1d:
+        return np.poly1d(to_dense(self._key))
 
+    def save(self, path: str):
+        _write_key_file(path, PUBLIC_KEY, self._base, to_dense(self._key))
 
-def generate_abramov_keypair(base: int, polynomial_degree: int) -> Tuple[AbramovPrivateKey, AbramovPublicKey]:
+    # With mmap the key polynomial is a read-only view of the file, so worker
+    # processes share its pages instead of each holding a copy
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "AbramovPublicKey":
+        base, coefficients = _read_key_file(path, PUBLIC_KEY, mmap)
+        return cls(base, np.poly1d(coefficients))
+
+
+# The key polynomial is (c1*x + c0) times even-degree multipliers without rational roots,
+# so -c0/c1 is its only rational root
+def generate_key_factors(polynomial_degree: int) -> Tuple[int, int, List[SparsePolynomial]]:
     coef_at_first_deg = secrets.randbelow(MAX_COEFFICIENT_VALUE) * secrets.randbelow(MAX_COEFFICIENT_VALUE) + 1
     coef_at_zero_deg = secrets.randbelow(MAX_COEFFICIENT_VALUE) * secrets.randbelow(MAX_COEFFICIENT_VALUE) + 1
-    key_polynomial = np.poly1d([coef_at_first_deg, coef_at_zero_deg])
+    obfuscating_polynomials = []
 
     if polynomial_degree % 2 == 0:
         degree = polynomial_degree
@@ -54,11 +208,21 @@ def generate_abramov_keypair(base: int, polynomial_degree: int) -> Tuple[Abramov
 
     while degree != 0:
         tmp_degree = secrets.randbelow(int(degree / 2)) + 1
-        obfuscating_polynomial = generate_obfuscating_multiplier(2 * tmp_degree)
-        key_polynomial = key_polynomial * obfuscating_polynomial
+        obfuscating_polynomials.append(generate_sparse_obfuscating_multiplier(2 * tmp_degree))
         degree -= tmp_degree * 2
 
-    key_polynomial += base
+    return coef_at_first_deg, coef_at_zero_deg, obfuscating_polynomials
+
+
+def generate_abramov_keypair(base: int, polynomial_degree: int) -> Tuple[AbramovPrivateKey, AbramovPublicKey]:
+    coef_at_first_deg, coef_at_zero_deg, obfuscating_polynomials = generate_key_factors(polynomial_degree)
+    linear_polynomial = SparsePolynomial([0, 1], [coef_at_zero_deg, coef_at_first_deg])
+
+    # Binomial factors keep the lower levels of the tree sparse, the upper ones turn dense on their own
+    key_polynomial = product_tree([linear_polynomial, *obfuscating_polynomials], multiply)
+    key_polynomial = add_constant(key_polynomial, base)
+    if not isinstance(key_polynomial, SparsePolynomial):
+        key_polynomial = np.poly1d(key_polynomial)
     root = - coef_at_zero_deg / coef_at_first_deg
 
     private_key = AbramovPrivateKey(root)
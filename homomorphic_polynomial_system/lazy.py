@@ -0,0 +1,231 @@
+import heapq
+import numbers
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+from .enc_num import EncryptedNumber
+from .polymath import multiply
+
+LEAF = "leaf"
+CONSTANT = "constant"
+ADD = "add"
+SUB = "sub"
+MUL = "mul"
+
+
+# Deferred computation over encrypted numbers: operators only record nodes of an
+# expression DAG, the arithmetic runs on evaluate() after the graph is optimized
+class LazyNumber:
+    def __init__(self, graph: "ExpressionGraph", op: str, operands: tuple = (), value: EncryptedNumber = None):
+        self.graph = graph
+        self.op = op
+        self.operands = operands
+        self.value = value
+
+    def __add__(self, other):
+        return self.graph.node(ADD, self, other)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return self.graph.node(SUB, self, other)
+
+    def __rsub__(self, other):
+        return self.graph.node(SUB, other, self)
+
+    def __mul__(self, other):
+        return self.graph.node(MUL, self, other)
+
+    __rmul__ = __mul__
+
+    def evaluate(self) -> EncryptedNumber:
+        return evaluate(self)[0]
+
+
+class ExpressionGraph:
+    def __init__(self):
+        self._nodes: Dict[tuple, LazyNumber] = {}
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def leaf(self, encrypted_number: EncryptedNumber) -> LazyNumber:
+        key = (LEAF, id(encrypted_number))
+        if key not in self._nodes:
+            self._nodes[key] = LazyNumber(self, LEAF, value=encrypted_number)
+        return self._nodes[key]
+
+    # Plaintext integers are leaves holding a constant polynomial, one per value
+    def constant(self, value: int) -> LazyNumber:
+        key = (CONSTANT, int(value))
+        if key not in self._nodes:
+            self._nodes[key] = LazyNumber(self, LEAF, value=EncryptedNumber.from_coefficients([int(value)]))
+        return self._nodes[key]
+
+    # Structurally equal subexpressions are hash-consed into one node, with the
+    # operands of commutative operations put into a canonical order first
+    def node(self, op: str, a: Union[LazyNumber, EncryptedNumber, int], b: Union[LazyNumber, EncryptedNumber, int]):
+        a, b = self._wrap(a), self._wrap(b)
+        if op in (ADD, MUL) and id(b) < id(a):
+            a, b = b, a
+        key = (op, id(a), id(b))
+        if key not in self._nodes:
+            self._nodes[key] = LazyNumber(self, op, (a, b))
+        return self._nodes[key]
+
+    def _wrap(self, operand) -> LazyNumber:
+        if isinstance(operand, LazyNumber):
+            if operand.graph is not self:
+                raise ValueError("Operands belong to different expression graphs")
+            return operand
+        if isinstance(operand, EncryptedNumber):
+            return self.leaf(operand)
+        if isinstance(operand, numbers.Integral):
+            return self.constant(operand)
+        raise TypeError(f"Unsupported operand type: {type(operand).__name__}")
+
+
+def lazy(*encrypted_numbers: EncryptedNumber, graph: ExpressionGraph = None) -> List[LazyNumber]:
+    graph = ExpressionGraph() if graph is None else graph
+    return [graph.leaf(encrypted_number) for encrypted_number in encrypted_numbers]
+
+
+# Flattens nested additions and subtractions into {node: coefficient}; repeated
+# terms collapse into one term with an integer coefficient. An explicit stack
+# keeps long chains of operations clear of the recursion limit
+def _sum_terms(node: LazyNumber) -> Dict[int, list]:
+    terms: Dict[int, list] = {}
+    stack = [(node, 1)]
+    while stack:
+        current, sign = stack.pop()
+        if current.op == ADD:
+            stack.append((current.operands[1], sign))
+            stack.append((current.operands[0], sign))
+        elif current.op == SUB:
+            stack.append((current.operands[1], -sign))
+            stack.append((current.operands[0], sign))
+        else:
+            term = terms.setdefault(id(current), [current, 0])
+            term[1] += sign
+    return terms
+
+
+def _factors(node: LazyNumber) -> List[LazyNumber]:
+    factors: List[LazyNumber] = []
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current.op == MUL:
+            stack.append(current.operands[1])
+            stack.append(current.operands[0])
+        else:
+            factors.append(current)
+    return factors
+
+
+class _Evaluator:
+    def __init__(self):
+        self._memo: Dict[int, np.ndarray] = {}
+        self._reducers: Dict[int, object] = {}
+        self._flattened: Dict[int, list] = {}
+        self._terms: Dict[int, list] = {}
+
+    # Sums are flattened into terms and products into factors; these are the
+    # nodes that have to be evaluated first
+    def _operands(self, node: LazyNumber) -> list:
+        if id(node) not in self._flattened:
+            if node.op == LEAF:
+                operands = []
+            elif node.op == MUL:
+                operands = _factors(node)
+            else:
+                self._terms[id(node)] = [term for term in _sum_terms(node).values() if term[1] != 0]
+                operands = [term for term, _ in self._terms[id(node)]]
+            self._flattened[id(node)] = operands
+        return self._flattened[id(node)]
+
+    # Post-order walk with an explicit stack: a node is computed once all of its
+    # operands are in the memo
+    def coefficients(self, node: LazyNumber) -> np.ndarray:
+        stack = [node]
+        while stack:
+            current = stack[-1]
+            if id(current) in self._memo:
+                stack.pop()
+                continue
+            pending = [operand for operand in self._operands(current) if id(operand) not in self._memo]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            self._memo[id(current)] = self._compute(current)
+            self._reducers[id(current)] = self._reducer(current)
+        return self._memo[id(node)]
+
+    def _compute(self, node: LazyNumber) -> np.ndarray:
+        if node.op == LEAF:
+            return node.value.coefficients
+        if node.op == MUL:
+            return self._product(node)
+        return self._sum(node)
+
+    # Like eager arithmetic, a result keeps the reducer of its operands
+    def _reducer(self, node: LazyNumber):
+        if node.op == LEAF:
+            return node.value.reducer
+        return next((self._reducers[id(operand)] for operand in self._operands(node)
+                     if self._reducers[id(operand)] is not None), None)
+
+    def reducer(self, node: LazyNumber):
+        self.coefficients(node)
+        return self._reducers[id(node)]
+
+    # Sums of (products of) terms are fused into a single accumulator buffer;
+    # coefficients are in ascending degree order, as in EncryptedNumber
+    def _sum(self, node: LazyNumber) -> np.ndarray:
+        parts = [(self._memo[id(term)], coefficient) for term, coefficient in self._terms[id(node)]]
+        if not parts:
+            return np.zeros(1)
+
+        accumulator = np.zeros(max(len(part) for part, _ in parts))
+        for part, coefficient in parts:
+            target = accumulator[:len(part)]
+            if coefficient == 1:
+                target += part
+            elif coefficient == -1:
+                target -= part
+            else:
+                target += coefficient * part
+        return accumulator
+
+    # Multiplication trees are rebalanced Huffman-style: the two lowest-degree
+    # operands are always multiplied first, which keeps intermediates small
+    def _product(self, node: LazyNumber) -> np.ndarray:
+        factors = self._operands(node)
+        heap: List[Tuple[int, int, np.ndarray]] = []
+        for order, factor in enumerate(factors):
+            coefficients = self._memo[id(factor)]
+            heapq.heappush(heap, (len(coefficients), order, coefficients))
+
+        order = len(factors)
+        while len(heap) > 1:
+            _, _, a = heapq.heappop(heap)
+            _, _, b = heapq.heappop(heap)
+            product = multiply(a, b)
+            heapq.heappush(heap, (len(product), order, product))
+            order += 1
+        return heap[0][2]
+
+
+# Results get their operands' reducer, and its policy is applied to them
+def evaluate(*nodes: LazyNumber) -> List[EncryptedNumber]:
+    evaluator = _Evaluator()
+    results = []
+    for node in nodes:
+        coefficients = evaluator.coefficients(node)
+        reducer = evaluator.reducer(node)
+        if reducer is not None:
+            coefficients = reducer.apply_coefficients(coefficients)
+        results.append(EncryptedNumber.from_coefficients(coefficients, reducer))
+    return results
@@ -0,0 +1,74 @@
+from typing import List
+
+import numpy as np
+
+from .enc_num import EncryptedNumber
+from .enc_vec import EncryptedVector
+from . import polymath
+from .utils import trim_leading_zeros
+
+# Vector operands: EncryptedVector, list of EncryptedNumber or plaintext integers.
+# Matrix operands: list of EncryptedVector rows, nested lists of EncryptedNumber
+# or a 2-D plaintext array. Plaintext entries are constant polynomials.
+
+
+def _is_encrypted(entry) -> bool:
+    return isinstance(entry, (EncryptedNumber, EncryptedVector))
+
+
+# Descending coefficients of equal-width polynomials, right-aligned, with
+# the polynomial index along the first axis
+def _vector(operand) -> np.ndarray:
+    if isinstance(operand, EncryptedVector):
+        return operand.coefficients
+    operand = list(operand)
+    if any(_is_encrypted(entry) for entry in operand):
+        return EncryptedVector.from_list([_as_encrypted(entry) for entry in operand]).coefficients
+    return np.asarray(operand, dtype=np.float64).reshape(-1, 1)
+
+
+def _as_encrypted(entry) -> EncryptedNumber:
+    if isinstance(entry, EncryptedNumber):
+        return entry
+    return EncryptedNumber.from_coefficients([entry])
+
+
+def _matrix(operand) -> np.ndarray:
+    rows = [_vector(row) for row in operand]
+    if len({len(row) for row in rows}) > 1:
+        raise ValueError("Matrix rows have different lengths")
+    width = max((row.shape[1] for row in rows), default=1)
+    matrix = np.zeros((len(rows), len(rows[0]) if rows else 0, width))
+    for target, row in zip(matrix, rows):
+        target[:, width - row.shape[1]:] = row
+    return matrix
+
+
+def _check_inner(a: np.ndarray, b: np.ndarray):
+    if a.shape[1] != b.shape[0]:
+        raise ValueError(f"Inner dimensions do not match: {a.shape[1]} and {b.shape[0]}")
+
+
+# Polynomial sum of x[i] * y[i]
+def dot(x, y) -> EncryptedNumber:
+    a = _vector(x)[None]
+    b = _vector(y)[:, None]
+    _check_inner(a, b)
+    product = polymath.matmul(a, b)[0, 0]
+    return EncryptedNumber.from_coefficients(product[::-1], copy=False)
+
+
+def matvec(matrix, vector) -> EncryptedVector:
+    a = _matrix(matrix)
+    b = _vector(vector)[:, None]
+    _check_inner(a, b)
+    return EncryptedVector(trim_leading_zeros(polymath.matmul(a, b)[:, 0]))
+
+
+# Rows of the product, one EncryptedVector per row of the left operand
+def matmul(left, right) -> List[EncryptedVector]:
+    a = _matrix(left)
+    b = _matrix(right)
+    _check_inner(a, b)
+    product = trim_leading_zeros(polymath.matmul(a, b))
+    return [EncryptedVector(row) for row in product]
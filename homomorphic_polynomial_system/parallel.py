@@ -0,0 +1,178 @@
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .enc_num import EncryptedNumber
+from .enc_vec import EncryptedVector
+from .polymath import multiply, product_tree
+from .reduction import Reducer
+from .utils import trim_leading_zeros
+from .vars import *
+
+SharedMatrix = Tuple[str, Tuple[int, int]]
+
+
+# Ciphertexts travel to the workers as one padded coefficient matrix in shared
+# memory; only its name, shape and the row range of every task are pickled
+def _share(encrypted_numbers: List[EncryptedNumber]) -> Tuple[shared_memory.SharedMemory, Tuple[int, int]]:
+    coefficients = EncryptedVector.from_list(encrypted_numbers).coefficients
+    memory = shared_memory.SharedMemory(create=True, size=max(coefficients.nbytes, 1))
+    np.ndarray(coefficients.shape, dtype=np.float64, buffer=memory.buf)[:] = coefficients
+    return memory, coefficients.shape
+
+
+def _attach(matrix: SharedMatrix, start: int, stop: int, task: Callable[[np.ndarray], object]):
+    name, shape = matrix
+    memory = shared_memory.SharedMemory(name=name)
+    rows = np.ndarray(shape, dtype=np.float64, buffer=memory.buf)[start:stop]
+    try:
+        return task(rows)
+    finally:
+        # The view must be gone before the mapping can be closed
+        del rows
+        memory.close()
+
+
+def _sum_rows(rows: np.ndarray) -> np.ndarray:
+    return trim_leading_zeros(rows.sum(axis=0))
+
+
+# Rows and partial results are in descending order, the reducer works on ascending coefficients
+def _reduce(coefficients: np.ndarray, reducer: Optional[Reducer]) -> np.ndarray:
+    if reducer is None:
+        return coefficients
+    return reducer.apply_coefficients(coefficients[::-1])[::-1]
+
+
+def _multiply_pair(a: np.ndarray, b: np.ndarray, reducer: Optional[Reducer] = None) -> np.ndarray:
+    return _reduce(multiply(a, b), reducer)
+
+
+# Every intermediate product is reduced by the policy, as a chain of eager * would be
+def _multiply_rows(rows: np.ndarray, reducer: Optional[Reducer] = None) -> np.ndarray:
+    return product_tree([trim_leading_zeros(row) for row in rows], lambda a, b: _multiply_pair(a, b, reducer))
+
+
+def _sum_task(matrix: SharedMatrix, start: int, stop: int) -> np.ndarray:
+    return _attach(matrix, start, stop, _sum_rows)
+
+
+def _product_task(matrix: SharedMatrix, start: int, stop: int, reducer: Optional[Reducer]) -> np.ndarray:
+    return _attach(matrix, start, stop, lambda rows: _multiply_rows(rows, reducer))
+
+
+def _map_task(matrix: SharedMatrix, start: int, stop: int, func: Callable,
+              reducers: List[Optional[Reducer]]) -> List[np.ndarray]:
+    return _attach(matrix, start, stop, lambda rows: [
+        func(EncryptedNumber.from_coefficients(row[::-1], reducer)).coefficients
+        for row, reducer in zip(rows, reducers)
+    ])
+
+
+def _add(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    if len(a) < len(b):
+        a, b = b, a
+    result = a.copy()
+    result[len(a) - len(b):] += b
+    return result
+
+
+# The reducer an eager chain of operators would end up with: the first one set
+def _reducer(encrypted_numbers: List[EncryptedNumber]) -> Optional[Reducer]:
+    return next((number.reducer for number in encrypted_numbers if number.reducer is not None), None)
+
+
+# Partial results are in the shared matrix' descending order
+def _wrap(coefficients: np.ndarray, reducer: Optional[Reducer] = None) -> EncryptedNumber:
+    coefficients = coefficients[::-1]
+    if reducer is not None:
+        coefficients = reducer.apply_coefficients(coefficients)
+    return EncryptedNumber.from_coefficients(coefficients, reducer)
+
+
+def _ranges(count: int, workers: int) -> List[Tuple[int, int]]:
+    chunk = max(PARALLEL_MIN_CHUNK, -(-count // workers))
+    return [(start, min(start + chunk, count)) for start in range(0, count, chunk)]
+
+
+# The given executor, or a pool of its own for the duration of one call
+@contextmanager
+def _executor(executor: Optional[Executor], workers: int, count: int) -> Iterator[Executor]:
+    if executor is not None:
+        yield executor
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(_ranges(count, workers)))) as pool:
+            yield pool
+
+
+# Every task gets the shared matrix, its row range and args; row_args are
+# per-ciphertext lists, each task receives its slice of them
+def _run(encrypted_numbers: List[EncryptedNumber], task: Callable, executor: Executor, workers: int,
+         *args, row_args: Tuple[list, ...] = ()) -> list:
+    memory, shape = _share(encrypted_numbers)
+    try:
+        matrix = (memory.name, shape)
+        tasks = [(matrix, start, stop, *args, *[values[start:stop] for values in row_args])
+                 for start, stop in _ranges(len(encrypted_numbers), workers)]
+        return list(executor.map(task, *zip(*tasks)))
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+# Level by level like product_tree, with the pairs of every level multiplied by the executor
+def _product_tree(partial_products: List[np.ndarray], executor: Executor, reducer: Optional[Reducer]) -> np.ndarray:
+    level = list(partial_products)
+    while len(level) > 1:
+        pairs = len(level) // 2
+        next_level = list(executor.map(_multiply_pair, level[0:2 * pairs:2], level[1:2 * pairs:2], [reducer] * pairs))
+        if len(level) % 2:
+            next_level.append(level[-1])
+        level = next_level
+    return level[0]
+
+
+def parallel_sum(encrypted_numbers: List[EncryptedNumber], executor: Executor = None,
+                 workers: int = None) -> EncryptedNumber:
+    encrypted_numbers = list(encrypted_numbers)
+    reducer = _reducer(encrypted_numbers)
+    if len(encrypted_numbers) <= PARALLEL_MIN_CHUNK:
+        return _wrap(_sum_rows(EncryptedVector.from_list(encrypted_numbers).coefficients), reducer)
+    workers = workers or os.cpu_count() or 1
+    with _executor(executor, workers, len(encrypted_numbers)) as pool:
+        partial_sums = _run(encrypted_numbers, _sum_task, pool, workers)
+    return _wrap(product_tree(partial_sums, _add), reducer)
+
+
+# The partial products meet in a tree whose upper levels, where the operands
+# are largest, are multiplied by the executor as well
+def parallel_product(encrypted_numbers: List[EncryptedNumber], executor: Executor = None,
+                     workers: int = None) -> EncryptedNumber:
+    encrypted_numbers = list(encrypted_numbers)
+    reducer = _reducer(encrypted_numbers)
+    if len(encrypted_numbers) <= PARALLEL_MIN_CHUNK:
+        return _wrap(_multiply_rows(EncryptedVector.from_list(encrypted_numbers).coefficients, reducer), reducer)
+    workers = workers or os.cpu_count() or 1
+    with _executor(executor, workers, len(encrypted_numbers)) as pool:
+        partial_products = _run(encrypted_numbers, _product_task, pool, workers, reducer)
+        return _wrap(_product_tree(partial_products, pool, reducer), reducer)
+
+
+# func must be picklable (a module-level function), it receives and returns
+# EncryptedNumber; every input keeps its reducer, and so does its result
+def parallel_map(func: Callable[[EncryptedNumber], EncryptedNumber], encrypted_numbers: List[EncryptedNumber],
+                 executor: Executor = None, workers: int = None) -> List[EncryptedNumber]:
+    encrypted_numbers = list(encrypted_numbers)
+    if len(encrypted_numbers) <= PARALLEL_MIN_CHUNK:
+        return [func(encrypted_number) for encrypted_number in encrypted_numbers]
+    reducers = [encrypted_number.reducer for encrypted_number in encrypted_numbers]
+    workers = workers or os.cpu_count() or 1
+    with _executor(executor, workers, len(encrypted_numbers)) as pool:
+        chunks = _run(encrypted_numbers, _map_task, pool, workers, func, row_args=(reducers,))
+    coefficients = [result for chunk in chunks for result in chunk]
+    return [EncryptedNumber.from_coefficients(result, reducer, copy=False)
+            for result, reducer in zip(coefficients, reducers)]
@@ -0,0 +1,289 @@
+import json
+import os
+import platform
+
+import numpy as np
+
+from .vars import *
+
+
+# Crossover lengths used by multiply; they start at the vars defaults and are
+# replaced by calibrated values from the tuning cache when one exists (see tuning)
+class _Thresholds:
+    karatsuba = KARATSUBA_MULTIPLICATION_THRESHOLD
+    fft = FFT_MULTIPLICATION_THRESHOLD
+
+
+def get_thresholds() -> dict:
+    return {"karatsuba": _Thresholds.karatsuba, "fft": _Thresholds.fft}
+
+
+def set_thresholds(karatsuba: int = None, fft: int = None):
+    if karatsuba is not None:
+        _Thresholds.karatsuba = max(int(karatsuba), 2)
+    if fft is not None:
+        _Thresholds.fft = max(int(fft), 1)
+
+
+def reset_thresholds():
+    set_thresholds(KARATSUBA_MULTIPLICATION_THRESHOLD, FFT_MULTIPLICATION_THRESHOLD)
+
+
+def get_tuning_cache_path(path: str = None) -> str:
+    return os.path.expanduser(path or os.environ.get(TUNING_CACHE_ENV) or TUNING_CACHE_FILE)
+
+
+# The cache maps host names to thresholds, so a home directory shared between
+# different machines keeps one calibration per machine
+def load_thresholds(path: str = None) -> bool:
+    try:
+        with open(get_tuning_cache_path(path)) as file:
+            thresholds = json.load(file)[platform.node()]
+        set_thresholds(thresholds["karatsuba"], thresholds["fft"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
+    return True
+
+
+def is_integral(coefficients: np.ndarray) -> bool:
+    return bool(np.all(np.mod(coefficients, 1) == 0))
+
+
+def fft_size(length: int) -> int:
+    return 1 << (length - 1).bit_length()
+
+
+# FFT convolution in float64 is only trusted when its result can be rounded
+# back to the exact integer coefficients that np.convolve would produce;
+# `terms` products summed up in the frequency domain widen the bound accordingly
+def fft_is_exact(a: np.ndarray, b: np.ndarray, terms: int = 1) -> bool:
+    if not (is_integral(a) and is_integral(b)):
+        return False
+    if a.size == 0 or b.size == 0:
+        return True
+    length = a.shape[-1] + b.shape[-1] - 1
+    bound = np.max(np.abs(a)) * np.max(np.abs(b)) * min(a.shape[-1], b.shape[-1]) * fft_size(length).bit_length()
+    bound *= terms
+    return bool(bound < FFT_EXACT_BOUND)
+
+
+def fft_multiply(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    length = len(a) + len(b) - 1
+    size = fft_size(length)
+    product = np.fft.irfft(np.fft.rfft(a, size) * np.fft.rfft(b, size), size)[:length]
+    return np.round(product)
+
+
+# Splits the longer operand in halves, a = a0 + x ** m * a1, and gets the middle
+# term from one product of the sums: three half-size products instead of four.
+# Halves shorter than the threshold are multiplied by np.convolve
+def karatsuba_multiply(a: np.ndarray, b: np.ndarray, threshold: int = None) -> np.ndarray:
+    threshold = _Thresholds.karatsuba if threshold is None else max(threshold, 2)
+    if len(a) < len(b):
+        a, b = b, a
+    if len(b) < threshold:
+        return np.convolve(a, b)
+
+    half = len(a) // 2
+    product = np.zeros(len(a) + len(b) - 1)
+    low = karatsuba_multiply(a[:half], b[:half], threshold)
+    product[:len(low)] += low
+    if len(b) <= half:
+        high = karatsuba_multiply(a[half:], b, threshold)
+        product[half:half + len(high)] += high
+        return product
+
+    high = karatsuba_multiply(a[half:], b[half:], threshold)
+    middle = karatsuba_multiply(_add_padded(a[:half], a[half:]), _add_padded(b[:half], b[half:]), threshold)
+    middle[:len(low)] -= low
+    middle[:len(high)] -= high
+    product[half:half + len(middle)] += middle[:len(product) - half]
+    product[2 * half:2 * half + len(high)] += high
+    return product
+
+
+def _add_padded(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    if len(a) < len(b):
+        a, b = b, a
+    result = a.copy()
+    result[:len(b)] += b
+    return result
+
+
+# Strategy by the shorter operand length: np.convolve, Karatsuba, or the FFT
+# when its rounded result is provably exact (otherwise Karatsuba takes over)
+def multiply(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    length = min(len(a), len(b))
+
+    if length >= _Thresholds.fft and fft_is_exact(a, b):
+        return fft_multiply(a, b)
+    if length >= _Thresholds.karatsuba:
+        return karatsuba_multiply(a, b)
+
+    return np.convolve(a, b)
+
+
+def multiply_polynomials(p: np.poly1d, q: np.poly1d) -> np.poly1d:
+    return np.poly1d(multiply(p.coef, q.coef))
+
+
+def schoolbook_multiply_batch(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    if a.shape[1] < b.shape[1]:
+        a, b = b, a
+    product = np.zeros((a.shape[0], a.shape[1] + b.shape[1] - 1))
+    for shift in range(b.shape[1]):
+        product[:, shift:shift + a.shape[1]] += a * b[:, shift:shift + 1]
+    return product
+
+
+def fft_multiply_batch(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    length = a.shape[1] + b.shape[1] - 1
+    size = fft_size(length)
+    product = np.fft.irfft(np.fft.rfft(a, size, axis=1) * np.fft.rfft(b, size, axis=1), size, axis=1)[:, :length]
+    return np.round(product)
+
+
+# Row-wise product of two stacks of coefficient arrays
+def multiply_batch(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+
+    if min(a.shape[1], b.shape[1]) >= _Thresholds.fft and fft_is_exact(a, b):
+        return fft_multiply_batch(a, b)
+
+    return schoolbook_multiply_batch(a, b)
+
+
+def schoolbook_matmul(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    width = a.shape[2] + b.shape[2] - 1
+    product = np.zeros((a.shape[0], b.shape[1], width))
+    if b.shape[2] <= a.shape[2]:
+        for shift in range(b.shape[2]):
+            product[:, :, shift:shift + a.shape[2]] += np.einsum("mnw,np->mpw", a, b[:, :, shift])
+    else:
+        for shift in range(a.shape[2]):
+            product[:, :, shift:shift + b.shape[2]] += np.einsum("mn,npw->mpw", a[:, :, shift], b)
+    return product
+
+
+# Every operand is transformed once and the products are summed up in the
+# frequency domain, so there is a single inverse transform per output entry
+def fft_matmul(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    width = a.shape[2] + b.shape[2] - 1
+    size = fft_size(width)
+    spectrum = np.einsum("mnf,npf->mpf", np.fft.rfft(a, size, axis=2), np.fft.rfft(b, size, axis=2))
+    return np.round(np.fft.irfft(spectrum, size, axis=2)[:, :, :width])
+
+
+# Wide operands the FFT cannot handle exactly: one np.convolve per pair, as multiply does
+def convolve_matmul(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    product = np.zeros((a.shape[0], b.shape[1], a.shape[2] + b.shape[2] - 1))
+    for i, j, k in np.ndindex(a.shape[0], b.shape[1], a.shape[1]):
+        product[i, j] += np.convolve(a[i, k], b[k, j])
+    return product
+
+
+# Matrix product of polynomial matrices: a is (m, n, width), b is (n, p, width)
+# and entry (i, j) of the result is the polynomial sum of a[i, k] * b[k, j]
+def matmul(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+
+    if min(a.shape[2], b.shape[2]) < _Thresholds.fft:
+        return schoolbook_matmul(a, b)
+    if fft_is_exact(a, b, a.shape[1]):
+        return fft_matmul(a, b)
+    return convolve_matmul(a, b)
+
+
+# Multiplies the factors pairwise level by level, so operands of similar size meet
+# and the fast multiplication paths apply to the big products at the top
+def product_tree(factors: list, multiplication=multiply):
+    if not factors:
+        raise ValueError("Product of no factors")
+    level = list(factors)
+    while len(level) > 1:
+        next_level = [multiplication(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            next_level.append(level[-1])
+        level = next_level
+    return level[0]
+
+
+# Same dispatch as multiply, but for operands whose coefficients are rational
+# anyway: large products use the FFT without rounding to integers
+def multiply_floats(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+
+    if min(len(a), len(b)) >= _Thresholds.fft:
+        length = len(a) + len(b) - 1
+        size = fft_size(length)
+        return np.fft.irfft(np.fft.rfft(a, size) * np.fft.rfft(b, size), size)[:length]
+
+    return np.convolve(a, b)
+
+
+# Power series inverse of f (ascending order) modulo x ** length by Newton
+# iteration: every step doubles the number of correct terms
+def series_inverse(f: np.ndarray, length: int, start: np.ndarray = None) -> np.ndarray:
+    g = np.array([1 / f[0]]) if start is None or len(start) == 0 else start
+    while len(g) < length:
+        precision = min(2 * len(g), length)
+        error = -multiply_floats(f[:precision], g)[:precision]
+        error[0] += 1
+        g = np.concatenate([g, multiply_floats(g, error[len(g):precision])[:precision - len(g)]])
+    return g[:length]
+
+
+# Polynomial division (descending order, like poly1d) through the reversed
+# divisor's inverse: rev(q) = rev(a) * rev(b) ** -1 mod x ** (deg a - deg b + 1)
+def fast_divmod(a: np.ndarray, b: np.ndarray, inverse: np.ndarray = None):
+    quotient_length = len(a) - len(b) + 1
+    if quotient_length <= 0:
+        return np.zeros(1), a
+    if inverse is None or len(inverse) < quotient_length:
+        inverse = series_inverse(b, quotient_length, inverse)
+
+    quotient = multiply_floats(a[:quotient_length], inverse[:quotient_length])[:quotient_length]
+    remainder = a[-(len(b) - 1):] - multiply_floats(quotient, b)[-(len(b) - 1):] if len(b) > 1 else np.zeros(1)
+    return quotient, remainder
+
+
+# Whether quotient * b + remainder gives a back up to the rounding errors of
+# a stable division, relative to a's largest coefficient
+def division_is_accurate(a: np.ndarray, b: np.ndarray, quotient: np.ndarray, remainder: np.ndarray) -> bool:
+    restored = multiply_floats(quotient, b)
+    restored[len(restored) - len(remainder):] += remainder
+    residual = np.max(np.abs(restored - a))
+    return bool(residual <= len(a) * np.finfo(np.float64).eps * np.max(np.abs(a)))
+
+
+# Whether every root of b lies inside the unit circle (the leading coefficient
+# outweighs all others): then the reversed divisor's inverse series decays and
+# Newton division is as stable as long division. An O(n) check
+def is_well_conditioned(b: np.ndarray) -> bool:
+    return bool(np.abs(b[0]) > np.sum(np.abs(b[1:])))
+
+
+# Long division (np.polydiv) is quadratic; from FAST_DIVISION_THRESHOLD on both
+# the divisor and the quotient are long enough for the Newton inverse to pay off.
+# It is only tried for well-conditioned divisors (ciphertexts rarely are), and
+# its result is still checked, long division taking over when it is off
+def divide(a: np.ndarray, b: np.ndarray):
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    quotient_length = len(a) - len(b) + 1
+
+    if min(quotient_length, len(b)) >= FAST_DIVISION_THRESHOLD and is_well_conditioned(b):
+        with np.errstate(over='ignore', invalid='ignore'):
+            quotient, remainder = fast_divmod(a, b)
+            accurate = division_is_accurate(a, b, quotient, remainder)
+        if accurate:
+            return quotient, remainder
+
+    return np.polydiv(a, b)
+
+load_thresholds()
@@ -0,0 +1,68 @@
+import numpy as np
+
+from .vars import *
+
+REDUCTION_POLICIES = (REDUCE_MANUALLY, REDUCE_ALWAYS, REDUCE_ABOVE_THRESHOLD)
+
+
+# (key_polynomial - base) vanishes at the secret root, so the remainder of a
+# ciphertext modulo it decrypts to the same number with degree below the key's
+class Reducer:
+    def __init__(self, modulus: np.ndarray, policy: str = REDUCE_MANUALLY, threshold: int = None):
+        if policy not in REDUCTION_POLICIES:
+            raise ValueError(f"Unknown reduction policy: {policy}")
+        self._modulus = np.asarray(modulus, dtype=np.float64)
+        self._policy = policy
+        self._threshold = self.get_degree() if threshold is None else threshold
+        self._divisor = None
+
+    def get_degree(self) -> int:
+        return len(self._modulus) - 1
+
+    def get_policy(self):
+        return self._policy
+
+    def get_threshold(self):
+        return self._threshold
+
+    # Decryption amplifies coefficient errors by the root's powers, so the
+    # remainder is computed exactly (see rns.RNSDivisor); None when it has no
+    # exact float64 form, which is what a ciphertext that lost precision gets
+    def _remainder(self, coefficients: np.ndarray):
+        if len(coefficients) < len(self._modulus):
+            return coefficients
+        if self._divisor is None:
+            from .rns import RNSDivisor  # rns imports keygen, which imports this module
+            self._divisor = RNSDivisor(self._modulus)
+        return self._divisor.remainder(coefficients)
+
+    def remainder(self, coefficients: np.ndarray) -> np.ndarray:
+        remainder = self._remainder(coefficients)
+        if remainder is None:
+            raise ValueError("Remainder has no exact float64 form: the ciphertext has lost precision")
+        return remainder
+
+    def reduce(self, polynomial: np.poly1d) -> np.poly1d:
+        return np.poly1d(self.remainder(polynomial.coef))
+
+    # Policies skip ciphertexts that cannot be reduced exactly instead of failing
+    def apply(self, polynomial: np.poly1d) -> np.poly1d:
+        if self.should_reduce(polynomial.order):
+            remainder = self._remainder(polynomial.coef)
+            if remainder is not None:
+                return np.poly1d(remainder)
+        return polynomial
+
+    def should_reduce(self, degree: int) -> bool:
+        return self._policy == REDUCE_ALWAYS or (self._policy == REDUCE_ABOVE_THRESHOLD and degree > self._threshold)
+
+    # Same as reduce/apply for coefficients in ascending degree order (EncryptedNumber's layout)
+    def reduce_coefficients(self, coefficients: np.ndarray) -> np.ndarray:
+        return self.remainder(coefficients[::-1])[::-1]
+
+    def apply_coefficients(self, coefficients: np.ndarray) -> np.ndarray:
+        if self.should_reduce(len(coefficients) - 1):
+            remainder = self._remainder(coefficients[::-1])
+            if remainder is not None:
+                return remainder[::-1]
+        return coefficients
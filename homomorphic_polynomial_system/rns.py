@@ -0,0 +1,303 @@
+from functools import lru_cache
+from math import prod
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .keygen import generate_key_factors
+from .polymath import fft_size, is_integral, product_tree
+from .vars import *
+
+
+@lru_cache(maxsize=None)
+def _twiddles(channel: int, size: int, invert: bool) -> np.ndarray:
+    prime = RNS_PRIMES[channel]
+    root = pow(RNS_PRIMITIVE_ROOTS[channel], (prime - 1) // size, prime)
+    if invert:
+        root = pow(root, prime - 2, prime)
+
+    twiddles = np.ones(max(size // 2, 1), dtype=np.int64)
+    block = 1
+    while block < len(twiddles):
+        twiddles[block:2 * block] = twiddles[:block] * pow(root, block, prime) % prime
+        block *= 2
+    return twiddles
+
+
+@lru_cache(maxsize=None)
+def _bit_reversal(size: int) -> np.ndarray:
+    bits = size.bit_length() - 1
+    indices = np.arange(size)
+    reversed_indices = np.zeros(size, dtype=np.int64)
+    for bit in range(bits):
+        reversed_indices |= ((indices >> bit) & 1) << (bits - 1 - bit)
+    return reversed_indices
+
+
+# Iterative number-theoretic transform along the last axis; every butterfly
+# stage is a single vectorized step over all blocks
+def ntt(values: np.ndarray, channel: int, invert: bool = False) -> np.ndarray:
+    prime = RNS_PRIMES[channel]
+    size = values.shape[-1]
+    twiddles = _twiddles(channel, size, invert)
+    values = values[..., _bit_reversal(size)]
+
+    half = 1
+    while half < size:
+        stage_twiddles = twiddles[::size // (2 * half)][:half]
+        blocks = values.reshape(*values.shape[:-1], size // (2 * half), 2, half)
+        u = blocks[..., 0, :]
+        v = blocks[..., 1, :] * stage_twiddles % prime
+        values = np.stack([(u + v) % prime, (u - v) % prime], axis=-2).reshape(*values.shape[:-1], size)
+        half *= 2
+
+    if invert:
+        values = values * pow(size, prime - 2, prime) % prime
+    return values
+
+
+def to_residues(values) -> np.ndarray:
+    values = np.asarray(values)
+    if values.dtype == object or values.dtype.kind == "f":
+        values = np.array([int(value) for value in values.ravel()], dtype=object).reshape(values.shape)
+    primes = np.array(RNS_PRIMES, dtype=values.dtype if values.dtype == object else np.int64)
+    return np.mod(values[np.newaxis, ...], primes.reshape(-1, *([1] * values.ndim))).astype(np.int64)
+
+
+@lru_cache(maxsize=None)
+def _crt_weights() -> Tuple[int, Tuple[int, ...]]:
+    modulus = prod(RNS_PRIMES)
+    return modulus, tuple(modulus // prime * pow(modulus // prime, -1, prime) for prime in RNS_PRIMES)
+
+
+def reconstruct(residues: Iterable[int]) -> int:
+    modulus, weights = _crt_weights()
+    value = sum(int(residue) * weight for residue, weight in zip(residues, weights)) % modulus
+    # Residues encode the symmetric range (-M/2, M/2)
+    if value > modulus // 2:
+        value -= modulus
+    return value
+
+
+# reconstruct for every column of a (channel, n) residue matrix at once
+def reconstruct_many(residues: np.ndarray) -> np.ndarray:
+    modulus, weights = _crt_weights()
+    values = np.array(weights, dtype=object) @ residues.astype(object) % modulus
+    values[values > modulus // 2] -= modulus
+    return values
+
+
+# Product of two residue vectors of one channel through the NTT
+def multiply_residues(a: np.ndarray, b: np.ndarray, channel: int) -> np.ndarray:
+    prime = RNS_PRIMES[channel]
+    length = len(a) + len(b) - 1
+    size = fft_size(length)
+    product = ntt(_pad_to(a, size), channel) * ntt(_pad_to(b, size), channel) % prime
+    return ntt(product, channel, invert=True)[:length]
+
+
+# Power series inverse of f modulo x ** length and RNS_PRIMES[channel] by Newton
+# iteration, as polymath.series_inverse does in floating point
+def series_inverse_residues(f: np.ndarray, length: int, channel: int, start: np.ndarray = None) -> np.ndarray:
+    prime = RNS_PRIMES[channel]
+    g = np.array([pow(int(f[0]), prime - 2, prime)]) if start is None or len(start) == 0 else start
+    while len(g) < length:
+        precision = min(2 * len(g), length)
+        error = -multiply_residues(f[:precision], g, channel)[:precision] % prime
+        error[0] = (error[0] + 1) % prime
+        g = np.concatenate([g, multiply_residues(g, error[len(g):precision], channel)[:precision - len(g)]])
+    return g[:length]
+
+
+# Integer numerators of float coefficients over their common power-of-two denominator
+def _integer_coefficients(coefficients: np.ndarray) -> Tuple[np.ndarray, int]:
+    if is_integral(coefficients):
+        if np.max(np.abs(coefficients), initial=0) < 2 ** 62:
+            return coefficients.astype(np.int64), 1
+        return np.array([int(c) for c in coefficients], dtype=object), 1
+    ratios = [float(c).as_integer_ratio() for c in coefficients]
+    scale = max(denominator for _, denominator in ratios)
+    return np.array([numerator * (scale // denominator) for numerator, denominator in ratios], dtype=object), scale
+
+
+# Exact remainders modulo a fixed integer polynomial (descending order, like
+# poly1d): every channel divides through the NTT and the reversed divisor's
+# inverse, which is kept and only extended for longer dividends. Only a
+# remainder whose coefficients float64 holds exactly is recovered; anything
+# else (a dividend that already lost precision has huge rational remainders)
+# is reported as None
+class RNSDivisor:
+    def __init__(self, divisor: np.ndarray):
+        divisor = np.asarray(divisor, dtype=np.float64)
+        if not is_integral(divisor):
+            raise ValueError("Divisor coefficients must be integers")
+        self._length = len(divisor)
+        self._residues = to_residues(divisor)
+        if np.any(self._residues[:, 0] == 0):
+            raise ValueError("Leading coefficient of the divisor is a multiple of an RNS prime")
+        self._inverses = [np.zeros(0, dtype=np.int64) for _ in RNS_PRIMES]
+
+    def remainder(self, coefficients: np.ndarray) -> Optional[np.ndarray]:
+        coefficients = np.asarray(coefficients, dtype=np.float64)
+        steps = len(coefficients) - self._length + 1
+        if steps <= 0:
+            return coefficients
+        if self._length == 1:
+            return np.zeros(1)
+        if not np.all(np.isfinite(coefficients)):
+            return None
+
+        numerators, scale = _integer_coefficients(coefficients)
+        residues = to_residues(numerators)
+        remainder = np.empty((len(RNS_PRIMES), self._length - 1), dtype=np.int64)
+        for channel, prime in enumerate(RNS_PRIMES):
+            if len(self._inverses[channel]) < steps:
+                self._inverses[channel] = series_inverse_residues(self._residues[channel], steps, channel,
+                                                                  self._inverses[channel])
+            dividend = residues[channel]
+            quotient = multiply_residues(dividend[:steps], self._inverses[channel][:steps], channel)[:steps]
+            product = multiply_residues(quotient, self._residues[channel], channel)
+            remainder[channel] = (dividend[steps:] - product[steps:]) % prime
+
+        values = reconstruct_many(remainder)
+        if any(abs(value) > REDUCTION_EXACT_BOUND for value in values):
+            return None
+        return np.array([value / scale for value in values], dtype=np.float64)
+
+
+# Polynomial with exact integer coefficients stored as residues: row i holds the
+# coefficients modulo RNS_PRIMES[i] in poly1d (descending) order
+class RNSPolynomial:
+    def __init__(self, residues: np.ndarray):
+        self.residues = residues
+
+    @classmethod
+    def from_coefficients(cls, coefficients) -> "RNSPolynomial":
+        return cls(to_residues(np.atleast_1d(coefficients)))
+
+    def __len__(self):
+        return self.residues.shape[1]
+
+    def __add__(self, other):
+        a, b = _align(self, other)
+        return RNSPolynomial(_mod(a + b))
+
+    def __sub__(self, other):
+        a, b = _align(self, other)
+        return RNSPolynomial(_mod(a - b))
+
+    def __mul__(self, other):
+        if isinstance(other, int):
+            return RNSPolynomial(_mod(self.residues * to_residues(other)[:, np.newaxis]))
+
+        product = np.empty((len(RNS_PRIMES), len(self) + len(other) - 1), dtype=np.int64)
+        for channel in range(len(RNS_PRIMES)):
+            product[channel] = multiply_residues(self.residues[channel], other.residues[channel], channel)
+        return RNSPolynomial(product)
+
+    def get_coefficients(self) -> List[int]:
+        return list(reconstruct_many(self.residues))
+
+
+def _mod(residues: np.ndarray) -> np.ndarray:
+    return np.mod(residues, np.array(RNS_PRIMES, dtype=np.int64)[:, np.newaxis])
+
+
+def _pad_to(values: np.ndarray, size: int) -> np.ndarray:
+    return np.pad(values, (0, size - len(values)))
+
+
+def _align(a: RNSPolynomial, b: RNSPolynomial) -> Tuple[np.ndarray, np.ndarray]:
+    width = max(len(a), len(b))
+    return (np.pad(a.residues, ((0, 0), (width - len(a), 0))),
+            np.pad(b.residues, ((0, 0), (width - len(b), 0))))
+
+
+class RNSEncryptedNumber:
+    def __init__(self, polynomial: RNSPolynomial):
+        self.polynomial = polynomial
+
+    def __add__(self, other):
+        return RNSEncryptedNumber(self.polynomial + other.polynomial)
+
+    def __sub__(self, other):
+        return RNSEncryptedNumber(self.polynomial - other.polynomial)
+
+    def __mul__(self, other):
+        return RNSEncryptedNumber(self.polynomial * other.polynomial)
+
+
+class RNSPrivateKey:
+    def __init__(self, coef_at_first_deg: int, coef_at_zero_deg: int):
+        self._coef_at_first_deg = coef_at_first_deg
+        self._coef_at_zero_deg = coef_at_zero_deg
+        # The rational root -c0/c1 becomes an ordinary residue in every channel
+        self._root_residues = np.array([- coef_at_zero_deg * pow(coef_at_first_deg, -1, prime) % prime
+                                        for prime in RNS_PRIMES], dtype=np.int64)
+        self._root_powers = np.ones((len(RNS_PRIMES), 1), dtype=np.int64)
+
+    def get_root_powers(self, width: int) -> np.ndarray:
+        primes = np.array(RNS_PRIMES, dtype=np.int64)
+        while self._root_powers.shape[1] < width:
+            step = self._root_powers[:, -1:] * self._root_residues[:, np.newaxis] % primes[:, np.newaxis]
+            self._root_powers = np.hstack([self._root_powers, step * self._root_powers % primes[:, np.newaxis]])
+        return self._root_powers[:, :width]
+
+    def decrypt(self, encrypted_number: RNSEncryptedNumber) -> int:
+        residues = encrypted_number.polynomial.residues
+        root_powers = self.get_root_powers(residues.shape[1])[:, ::-1]
+        primes = np.array(RNS_PRIMES, dtype=np.int64)
+        # Terms stay below 2 ** 30, so the sum fits into int64 for any realistic degree
+        channel_values = np.sum(residues * root_powers % primes[:, np.newaxis], axis=1) % primes
+        return reconstruct(channel_values)
+
+    def get_root(self):
+        return self._coef_at_zero_deg, self._coef_at_first_deg
+
+
+class RNSPublicKey:
+    def __init__(self, base: int, key_polynomial: RNSPolynomial):
+        self._base = base
+        self._key_polynomial = key_polynomial
+        self._key_powers = [RNSPolynomial.from_coefficients(1)]
+
+    def encode(self, number: int) -> List[int]:
+        sign = -1 if number < 0 else 1
+        number = abs(number)
+        digits = []
+        while True:
+            number, digit = divmod(number, self._base)
+            digits.append(sign * digit)
+            if number == 0:
+                return digits
+
+    def encrypt(self, number: int) -> RNSEncryptedNumber:
+        digits = self.encode(int(number))
+        while len(self._key_powers) < len(digits):
+            self._key_powers.append(self._key_powers[-1] * self._key_polynomial)
+
+        encrypted_polynomial = RNSPolynomial.from_coefficients(0)
+        for digit, key_power in zip(digits, self._key_powers):
+            if digit != 0:
+                encrypted_polynomial = encrypted_polynomial + key_power * digit
+        return RNSEncryptedNumber(encrypted_polynomial)
+
+    def get_base(self):
+        return self._base
+
+    def get_polynomial(self):
+        return self._key_polynomial
+
+
+def generate_rns_keypair(base: int, polynomial_degree: int) -> Tuple[RNSPrivateKey, RNSPublicKey]:
+    coef_at_first_deg, coef_at_zero_deg, obfuscating_polynomials = generate_key_factors(polynomial_degree)
+    factors = [RNSPolynomial.from_coefficients([coef_at_first_deg, coef_at_zero_deg])]
+    factors += [RNSPolynomial.from_coefficients(polynomial.to_dense()) for polynomial in obfuscating_polynomials]
+
+    key_polynomial = product_tree(factors, RNSPolynomial.__mul__)
+    key_polynomial = key_polynomial + RNSPolynomial.from_coefficients(base)
+
+    private_key = RNSPrivateKey(coef_at_first_deg, coef_at_zero_deg)
+    public_key = RNSPublicKey(base, key_polynomial)
+
+    return private_key, public_key
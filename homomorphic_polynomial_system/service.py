@@ -0,0 +1,131 @@
+import asyncio
+from concurrent.futures import Executor
+from typing import Callable, List
+
+from .enc_num import EncryptedNumber
+from .keygen import AbramovPrivateKey, AbramovPublicKey
+from .vars import *
+
+
+class _Batcher:
+    def __init__(self, run_batch: Callable[[list], list], max_batch_size: int, max_latency: float,
+                 max_queue_size: int, executor: Executor):
+        self._run_batch = run_batch
+        self._max_batch_size = max_batch_size
+        self._max_latency = max_latency
+        self._executor = executor
+        self._queue = asyncio.Queue(maxsize=max_queue_size)
+        self._batch = []  # requests taken off the queue and not answered yet
+        self._closed = False
+        self._task = asyncio.get_running_loop().create_task(self._serve())
+
+    # A full queue suspends the caller until the batcher catches up; a request
+    # that only gets in once the batcher is closed is cancelled right away
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        if self._closed:
+            future.cancel()
+        return await future
+
+    async def _collect(self):
+        self._batch.append(await self._queue.get())
+        deadline = asyncio.get_running_loop().time() + self._max_latency
+        while len(self._batch) < self._max_batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                self._batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+    # Errors are caught on the executor side: a traceback through this
+    # coroutine would let callers clearing frames (e.g. assertRaises) close it.
+    # A failed batch is retried item by item, so only the bad request fails
+    def _run_safely(self, items: list) -> list:
+        try:
+            return [(result, None) for result in self._run_batch(items)]
+        except Exception as error:
+            if len(items) == 1:
+                return [(None, error)]
+        return [self._run_safely([item])[0] for item in items]
+
+    async def _serve(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._collect()
+            items = [item for item, _ in self._batch]
+            outcomes = await loop.run_in_executor(self._executor, self._run_safely, items)
+            for (_, future), (result, error) in zip(self._batch, outcomes):
+                if future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+            self._batch = []
+
+    # Requests being collected or in flight are cancelled along with the queued ones
+    async def close(self):
+        self._closed = True
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        for _, future in self._batch:
+            future.cancel()
+        self._batch = []
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
+
+
+# Asyncio front end for the keys: concurrent encrypt/decrypt calls are grouped
+# into micro-batches (by size or by max_latency) and each batch runs as one
+# encrypt_many/decrypt_many call in an executor, off the event loop
+class BatchingCryptoService:
+    def __init__(self, public_key: AbramovPublicKey = None, private_key: AbramovPrivateKey = None,
+                 max_batch_size: int = SERVICE_MAX_BATCH_SIZE, max_latency: float = SERVICE_MAX_LATENCY,
+                 max_queue_size: int = SERVICE_MAX_QUEUE_SIZE, executor: Executor = None):
+        self._public_key = public_key
+        self._private_key = private_key
+        self._options = (max_batch_size, max_latency, max_queue_size, executor)
+        self._encryptor = None
+        self._decryptor = None
+
+    def _encrypt_batch(self, numbers: List[int]) -> List[EncryptedNumber]:
+        return self._public_key.encrypt_many(numbers).to_list()
+
+    def _decrypt_batch(self, encrypted_numbers: List[EncryptedNumber]) -> List[float]:
+        return self._private_key.decrypt_many(encrypted_numbers)
+
+    async def start(self):
+        if self._public_key is not None:
+            self._encryptor = _Batcher(self._encrypt_batch, *self._options)
+        if self._private_key is not None:
+            self._decryptor = _Batcher(self._decrypt_batch, *self._options)
+
+    async def stop(self):
+        for batcher in (self._encryptor, self._decryptor):
+            if batcher is not None:
+                await batcher.close()
+        self._encryptor = self._decryptor = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def encrypt(self, number: int) -> EncryptedNumber:
+        if self._encryptor is None:
+            raise RuntimeError("Service has no public key or is not started")
+        return await self._encryptor.submit(int(number))
+
+    async def decrypt(self, encrypted_number: EncryptedNumber) -> float:
+        if self._decryptor is None:
+            raise RuntimeError("Service has no private key or is not started")
+        return await self._decryptor.submit(encrypted_number)
@@ -0,0 +1,122 @@
+import secrets
+from typing import Union
+
+import numpy as np
+
+from .polymath import multiply as dense_multiply
+from .utils import trim_leading_zeros
+from .vars import *
+
+
+# Polynomial stored as its nonzero terms: degrees[i] is the exponent of values[i],
+# kept sorted and unique
+class SparsePolynomial:
+    def __init__(self, degrees: np.ndarray, values: np.ndarray):
+        self.degrees = np.asarray(degrees, dtype=np.int64)
+        self.values = np.asarray(values, dtype=np.float64)
+
+    @classmethod
+    def from_dense(cls, coefficients) -> "SparsePolynomial":
+        coefficients = np.asarray(coefficients, dtype=np.float64)
+        positions = np.flatnonzero(coefficients)
+        return cls(len(coefficients) - 1 - positions[::-1], coefficients[positions[::-1]])
+
+    def to_dense(self) -> np.ndarray:
+        coefficients = np.zeros(self.get_degree() + 1)
+        coefficients[self.get_degree() - self.degrees] = self.values
+        return coefficients
+
+    def to_poly1d(self) -> np.poly1d:
+        return np.poly1d(self.to_dense())
+
+    def get_degree(self) -> int:
+        return int(self.degrees[-1]) if len(self.degrees) else 0
+
+    def get_fill_ratio(self) -> float:
+        return len(self.degrees) / (self.get_degree() + 1)
+
+    def __len__(self):
+        return len(self.degrees)
+
+    def __add__(self, other):
+        return _aggregate(np.concatenate([self.degrees, other.degrees]), np.concatenate([self.values, other.values]))
+
+    def __sub__(self, other):
+        return _aggregate(np.concatenate([self.degrees, other.degrees]), np.concatenate([self.values, -other.values]))
+
+    def __mul__(self, other):
+        return multiply(self, other)
+
+
+Polynomial = Union[SparsePolynomial, np.ndarray]
+
+
+def _aggregate(degrees: np.ndarray, values: np.ndarray) -> SparsePolynomial:
+    unique_degrees, inverse = np.unique(degrees, return_inverse=True)
+    sums = np.bincount(inverse.ravel(), weights=values.ravel(), minlength=len(unique_degrees))
+    nonzero = sums != 0
+    return SparsePolynomial(unique_degrees[nonzero], sums[nonzero])
+
+
+def to_dense(polynomial: Polynomial) -> np.ndarray:
+    if isinstance(polynomial, SparsePolynomial):
+        return polynomial.to_dense()
+    return polynomial
+
+
+def densify_if_filled(polynomial: SparsePolynomial) -> Polynomial:
+    if polynomial.get_fill_ratio() > SPARSE_FILL_THRESHOLD:
+        return polynomial.to_dense()
+    return polynomial
+
+
+# Counterpart of densify_if_filled for dense input, which is returned as it is
+# (memory-mapped keys keep sharing their pages) unless it is sparse enough
+def sparsify_if_empty(coefficients: np.ndarray) -> Polynomial:
+    polynomial = SparsePolynomial.from_dense(coefficients)
+    if polynomial.get_fill_ratio() > SPARSE_FILL_THRESHOLD:
+        return coefficients
+    return polynomial
+
+
+def add_constant(polynomial: Polynomial, value: float) -> Polynomial:
+    if isinstance(polynomial, SparsePolynomial):
+        return polynomial + SparsePolynomial([0], [value])
+    polynomial = np.array(polynomial, dtype=np.float64)
+    polynomial[-1] += value
+    return polynomial
+
+
+# Horner's scheme for plaintext coefficients (descending order) at a polynomial
+# argument; intermediate results stay sparse as long as multiply keeps them so
+def evaluate(coefficients, x: Polynomial) -> Polynomial:
+    result = SparsePolynomial([], [])
+    for coefficient in coefficients:
+        result = multiply(result, x)
+        if coefficient:
+            result = add_constant(result, coefficient)
+    return result
+
+
+# Products of sparse operands stay sparse until the product is expected to fill
+# more than SPARSE_FILL_THRESHOLD of its coefficients; from there on the dense
+# (FFT-capable) multiplication takes over
+def multiply(a: Polynomial, b: Polynomial) -> Polynomial:
+    if isinstance(a, SparsePolynomial) and isinstance(b, SparsePolynomial):
+        expected_terms = len(a) * len(b)
+        if expected_terms <= SPARSE_FILL_THRESHOLD * (a.get_degree() + b.get_degree() + 1):
+            product = _aggregate(np.add.outer(a.degrees, b.degrees), np.multiply.outer(a.values, b.values))
+            return densify_if_filled(product)
+
+    return trim_leading_zeros(dense_multiply(to_dense(a), to_dense(b)))
+
+
+def generate_sparse_obfuscating_multiplier(even_degree: int) -> SparsePolynomial:
+    assert even_degree % 2 == 0, "Must be EVEN for the polynomial to have no rational roots"
+
+    coef_at_zero_deg = secrets.randbelow(MAX_COEFFICIENT_VALUE) + 1
+    if even_degree != 0:
+        coef_at_passed_deg = secrets.randbelow(MAX_COEFFICIENT_VALUE) + 1
+        return SparsePolynomial([0, even_degree], [coef_at_zero_deg, coef_at_passed_deg])
+    else:
+        return SparsePolynomial([0], [coef_at_zero_deg])
@@ -0,0 +1,107 @@
+import os
+from typing import Iterator, List, Union
+
+import numpy as np
+
+from .enc_num import EncryptedNumber
+from .enc_vec import EncryptedVector
+from .wire import Header, VERSION, DTYPES, HEADER_SIZE, read_header, as_vector, compact_dtype
+from .vars import *
+
+
+# Append-only file of fixed-width ciphertexts in the wire format: the header is
+# rewritten on every append, the rows are read back through np.memmap. New
+# stores start with int8 coefficients and the file is rewritten in a wider dtype
+# only when an appended ciphertext does not fit
+class CiphertextStore:
+    def __init__(self, path: str, width: int = None):
+        self._path = path
+        if os.path.exists(path):
+            with open(path, "rb") as file:
+                self._header = read_header(file.read(HEADER_SIZE))
+            if self._header.flags:
+                raise ValueError("Compressed ciphertext files cannot be memory-mapped")
+        else:
+            if width is None:
+                raise ValueError("Width is required to create a new store")
+            self._header = Header(VERSION, DTYPES[1], 0, width, 0)
+            with open(path, "wb") as file:
+                file.write(self._header.pack())
+
+    def __len__(self):
+        return self._header.count
+
+    def get_width(self):
+        return self._header.width
+
+    def append(self, encrypted_numbers: Union[EncryptedVector, List[EncryptedNumber], EncryptedNumber]):
+        coefficients = as_vector(encrypted_numbers).coefficients
+        width = self.get_width()
+        if coefficients.shape[1] > width:
+            raise ValueError(f"Ciphertext of width {coefficients.shape[1]} does not fit into store of width {width}")
+
+        dtype = np.promote_types(self._header.dtype, compact_dtype(coefficients))
+        if dtype != self._header.dtype:
+            self._widen(dtype)
+
+        rows = np.zeros((coefficients.shape[0], width), dtype=self._header.dtype)
+        rows[:, width - coefficients.shape[1]:] = coefficients
+
+        self._header = self._header._replace(count=self._header.count + rows.shape[0])
+        with open(self._path, "r+b") as file:
+            file.seek(0, os.SEEK_END)
+            file.write(rows.tobytes())
+            file.seek(0)
+            file.write(self._header.pack())
+
+    # Rewrites the stored rows chunk by chunk into a new file, which then replaces the old one
+    def _widen(self, dtype: np.dtype, chunk_size: int = STORE_CHUNK_SIZE):
+        header = self._header._replace(dtype=dtype)
+        temporary_path = self._path + ".widen"
+        with open(temporary_path, "wb") as file:
+            file.write(header.pack())
+            for chunk in self.iter_chunks(chunk_size):
+                file.write(chunk.coefficients.astype(dtype).tobytes())
+        os.replace(temporary_path, self._path)
+        self._header = header
+
+    def get_dtype(self) -> np.dtype:
+        return self._header.dtype
+
+    def _memmap(self) -> np.ndarray:
+        return np.memmap(self._path, dtype=self._header.dtype, mode="r", offset=HEADER_SIZE,
+                         shape=(self._header.count, self._header.width))
+
+    def iter_chunks(self, chunk_size: int = STORE_CHUNK_SIZE) -> Iterator[EncryptedVector]:
+        if len(self) == 0:
+            return
+        rows = self._memmap()
+        for start in range(0, len(self), chunk_size):
+            yield EncryptedVector(rows[start:start + chunk_size])
+
+    def __iter__(self) -> Iterator[EncryptedNumber]:
+        for chunk in self.iter_chunks():
+            yield from chunk
+
+    # Streaming reductions: one chunk is mapped at a time and folded into a
+    # single running accumulator ciphertext
+
+    def sum(self, chunk_size: int = STORE_CHUNK_SIZE) -> EncryptedNumber:
+        accumulator = EncryptedNumber()
+        for chunk in self.iter_chunks(chunk_size):
+            accumulator += chunk.sum()
+        return accumulator
+
+    # Plaintext weights scale the coefficients directly, since decryption is
+    # evaluation at the secret root and therefore linear
+    def dot(self, weights, chunk_size: int = STORE_CHUNK_SIZE) -> EncryptedNumber:
+        if len(weights) != len(self):
+            raise ValueError(f"Expected {len(self)} weights, got {len(weights)}")
+        accumulator = EncryptedNumber()
+        for index, chunk in enumerate(self.iter_chunks(chunk_size)):
+            chunk_weights = np.asarray(weights[index * chunk_size:index * chunk_size + len(chunk)], dtype=np.float64)
+            accumulator += EncryptedNumber.from_coefficients((chunk_weights @ chunk.coefficients)[::-1], copy=False)
+        return accumulator
+
+    def count(self) -> int:
+        return len(self)
@@ -0,0 +1,117 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+
+from .benchmark import measure
+from .polymath import karatsuba_multiply, fft_multiply, get_tuning_cache_path, set_thresholds
+from .vars import *
+
+DEFAULT_SIZES = (32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+DEFAULT_REPEAT = 5
+DEFAULT_MIN_TIME = 0.005  # seconds a single sample should last at least
+CALIBRATION_SEED = 20220601
+
+
+# Smallest size from which the candidate stays faster for all larger sizes; when
+# it never wins, the crossover is put beyond the largest measured size
+def _crossover(sizes: Sequence[int], faster: Callable[[int], bool]) -> int:
+    crossover = 2 * sizes[-1]
+    for size in reversed(sizes):
+        if not faster(size):
+            break
+        crossover = size
+    return crossover
+
+
+# Times np.convolve, one Karatsuba split and the FFT on random small-integer
+# operands of every size, then derives the crossovers: Karatsuba against
+# np.convolve, and the FFT against the better of the two below it
+def calibrate(sizes: Sequence[int] = DEFAULT_SIZES, repeat: int = DEFAULT_REPEAT,
+              min_time: float = DEFAULT_MIN_TIME) -> Dict[str, object]:
+    sizes = sorted(sizes)
+    rng = np.random.default_rng(CALIBRATION_SEED)
+    timings = {}
+    for size in sizes:
+        a = rng.integers(-9, 10, size).astype(np.float64)
+        b = rng.integers(-9, 10, size).astype(np.float64)
+        cases = {
+            "schoolbook": lambda: np.convolve(a, b),
+            "karatsuba": lambda: karatsuba_multiply(a, b, size),
+            "fft": lambda: fft_multiply(a, b),
+        }
+        timings[size] = {name: measure(case, repeat, 1, min_time)["min"] for name, case in cases.items()}
+
+    karatsuba = _crossover(sizes, lambda size: timings[size]["karatsuba"] < timings[size]["schoolbook"])
+
+    def best_direct(size: int) -> float:
+        if size >= karatsuba:
+            return min(timings[size]["schoolbook"], timings[size]["karatsuba"])
+        return timings[size]["schoolbook"]
+
+    fft = _crossover(sizes, lambda size: timings[size]["fft"] < best_direct(size))
+    return {"karatsuba": karatsuba, "fft": fft, "timings": timings}
+
+
+def save_thresholds(thresholds: Dict[str, object], path: str = None) -> str:
+    path = get_tuning_cache_path(path)
+    try:
+        with open(path) as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        cache = {}
+    if not isinstance(cache, dict):
+        cache = {}
+
+    cache[platform.node()] = {
+        "karatsuba": int(thresholds["karatsuba"]),
+        "fft": int(thresholds["fft"]),
+        "machine": platform.machine(),
+        "numpy": np.__version__,
+        "calibrated": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+    # Written to a temporary file first, so concurrent readers never see half a file
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "w") as file:
+        json.dump(cache, file, indent=2)
+    os.replace(temporary_path, path)
+    return path
+
+
+# Calibrates, stores the result for later processes and applies it to this one
+def tune(path: str = None, sizes: Sequence[int] = DEFAULT_SIZES, repeat: int = DEFAULT_REPEAT,
+         min_time: float = DEFAULT_MIN_TIME) -> Dict[str, object]:
+    thresholds = calibrate(sizes, repeat, min_time)
+    save_thresholds(thresholds, path)
+    set_thresholds(thresholds["karatsuba"], thresholds["fft"])
+    return thresholds
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m homomorphic_polynomial_system.tuning",
+                                     description="measure multiplication crossovers on this host")
+    parser.add_argument("--output", "-o", help=f"cache file (default: ${TUNING_CACHE_ENV} or {TUNING_CACHE_FILE})")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME)
+    parser.add_argument("--dry-run", action="store_true", help="print the thresholds without saving them")
+    args = parser.parse_args(argv)
+
+    if args.dry_run:
+        thresholds = calibrate(args.sizes, args.repeat, args.min_time)
+    else:
+        thresholds = tune(args.output, args.sizes, args.repeat, args.min_time)
+        print(f"Saved to {get_tuning_cache_path(args.output)}", file=sys.stderr)
+    print(json.dumps({"karatsuba": thresholds["karatsuba"], "fft": thresholds["fft"]}))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
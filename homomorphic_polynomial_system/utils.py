@@ -34,3 +34,61 @@ def is_zero(polynomial: np.poly1d) -> bool:
 
 def get_last(polynomial: np.poly1d):
     return polynomial[0]
+
+
+# Drops leading (highest degree) zero coefficients along the last axis,
+# keeping at least one column so the zero polynomial stays representable
+def trim_leading_zeros(coefficients: np.ndarray) -> np.ndarray:
+    nonzero = np.flatnonzero(np.any(coefficients != 0, axis=tuple(range(coefficients.ndim - 1))))
+    if len(nonzero) == 0:
+        return coefficients[..., -1:]
+    return coefficients[..., nonzero[0]:]
+
+
+# Largest exponent k with base ** k below the int64 limit
+def _chunk_exponent(base: int) -> int:
+    exponent = 1
+    while base ** (exponent + 1) <= np.iinfo(np.int64).max:
+        exponent += 1
+    return exponent
+
+
+# Splits non-negative integers into ascending digits in base `radix` along a new
+# last axis; with `count` unset it stops once every number is used up
+def _split(magnitudes: np.ndarray, radix: int, count: int = None) -> np.ndarray:
+    columns = []
+    while count is None or len(columns) < count:
+        columns.append((magnitudes % radix).astype(np.int64))
+        magnitudes = magnitudes // radix
+        if count is None and not np.any(magnitudes):
+            break
+    return np.stack(columns, axis=-1)
+
+
+# Ascending base-`base` digit matrix with one row per number. Negative numbers
+# get negated digits, which still add up to the number since encoding is linear.
+# Numbers beyond int64 are cut into base ** k chunks with Python ints first, and
+# every chunk is then expanded to k digits with vectorized divmod
+def to_digits(numbers, base: int) -> np.ndarray:
+    if not isinstance(numbers, np.ndarray) or numbers.dtype.kind not in "iu":
+        numbers = [int(number) for number in numbers]
+        try:
+            numbers = np.array(numbers, dtype=np.int64)
+        except OverflowError:
+            numbers = np.array(numbers, dtype=object)
+    if len(numbers) == 0:
+        return np.zeros((0, 1))
+
+    if numbers.dtype == object:
+        signs = np.array([-1 if number < 0 else 1 for number in numbers])
+        exponent = _chunk_exponent(base)
+        chunks = _split(np.array([abs(int(number)) for number in numbers], dtype=object), base ** exponent)
+        digits = _split(chunks, base, exponent).reshape(len(numbers), -1)
+    else:
+        signs = np.where(numbers < 0, -1, 1)
+        # The magnitude of the most negative int64 only fits into uint64
+        digits = _split(np.abs(numbers).astype(np.uint64), base)
+
+    nonzero = np.flatnonzero(np.any(digits != 0, axis=0))
+    digit_count = nonzero[-1] + 1 if len(nonzero) else 1
+    return (digits[:, :digit_count] * signs[:, None]).astype(np.float64)
@@ -10,3 +10,40 @@ ROUND_TO_INT = 0
 # recommended values for ~real cases
 MAX_POLYNOMIAL_DEGREE = 100000
 MIN_POLYNOMIAL_DEGREE = 10000
+
+# polynomial arithmetic
+KARATSUBA_MULTIPLICATION_THRESHOLD = 1024  # shortest operand length from which a Karatsuba split beats np.convolve
+FFT_MULTIPLICATION_THRESHOLD = 512  # shortest operand length from which FFT beats np.convolve
+FFT_EXACT_BOUND = 2 ** 49  # float64 FFT products round back to exact integers below this bound
+FAST_DIVISION_THRESHOLD = 32  # divisor and quotient length from which Newton division beats np.polydiv
+
+# exact backend: NTT-friendly primes below 2 ** 30 with their primitive roots,
+# so a product of two residues still fits into int64
+RNS_PRIMES = (998244353, 469762049, 167772161, 754974721)
+RNS_PRIMITIVE_ROOTS = (3, 3, 3, 11)
+
+# storage
+STORE_CHUNK_SIZE = 4096  # ciphertexts read per step of a streaming reduction
+SPARSE_FILL_THRESHOLD = 0.1  # share of nonzero coefficients from which polynomials are kept dense
+
+# ciphertext degree reduction policies
+REDUCTION_EXACT_BOUND = 2 ** 53  # reduced coefficients are kept only as integers float64 holds exactly
+REDUCE_MANUALLY = None
+REDUCE_ALWAYS = "always"
+REDUCE_ABOVE_THRESHOLD = "threshold"
+
+# parallel reductions
+PARALLEL_MIN_CHUNK = 256  # fewer ciphertexts per worker are reduced in the calling process
+
+# batching service
+SERVICE_MAX_BATCH_SIZE = 256
+SERVICE_MAX_LATENCY = 0.005  # seconds the first request of a batch may wait for company
+SERVICE_MAX_QUEUE_SIZE = 4096  # pending requests before callers are made to wait
+
+# encryption cache
+ENCRYPTION_CACHE_MAX_ENTRIES = 1024  # default bound when neither entries nor bytes are limited explicitly
+
+# multiplication tuning: calibrated thresholds are kept per host in a JSON file,
+# the environment variable overrides its location
+TUNING_CACHE_FILE = "~/.cache/homomorphic_polynomial_system/multiplication.json"
+TUNING_CACHE_ENV = "HPS_TUNING_CACHE"
@@ -0,0 +1,165 @@
+import struct
+from typing import List, NamedTuple, Union
+
+import numpy as np
+
+from .enc_num import EncryptedNumber
+from .enc_vec import EncryptedVector
+from .polymath import is_integral
+
+# magic, version, dtype code, flags, width (degree + 1), reserved, count
+HEADER_FORMAT = "<4sBBBxIIQ"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+MAGIC = b"HPSC"
+VERSION = 2  # 2: zero-run headers in the narrowest unsigned dtype instead of int64
+
+FLAG_ZERO_RUNS = 1
+
+DTYPES = {
+    0: np.dtype("<f8"),
+    1: np.dtype("i1"),
+    2: np.dtype("<i2"),
+    3: np.dtype("<i4"),
+    4: np.dtype("<i8"),
+}
+DTYPE_CODES = {dtype: code for code, dtype in DTYPES.items()}
+
+RUN_DTYPES = {
+    1: np.dtype("u1"),
+    2: np.dtype("<u2"),
+    3: np.dtype("<u4"),
+    4: np.dtype("<u8"),
+}
+
+
+class Header(NamedTuple):
+    version: int
+    dtype: np.dtype
+    flags: int
+    width: int
+    count: int
+
+    def pack(self) -> bytes:
+        return struct.pack(HEADER_FORMAT, MAGIC, self.version, DTYPE_CODES[self.dtype], self.flags,
+                           self.width, 0, self.count)
+
+
+def read_header(buffer) -> Header:
+    magic, version, dtype_code, flags, width, _, count = struct.unpack_from(HEADER_FORMAT, buffer)
+    if magic != MAGIC:
+        raise ValueError("Not a ciphertext buffer")
+    if version > VERSION:
+        raise ValueError(f"Unsupported ciphertext format version: {version}")
+    if dtype_code not in DTYPES:
+        raise ValueError(f"Unknown coefficient dtype code: {dtype_code}")
+    return Header(version, DTYPES[dtype_code], flags, width, count)
+
+
+# Narrowest dtype that holds every coefficient exactly: integral values go to the
+# smallest signed integer type covering their range, anything else stays float64
+def compact_dtype(coefficients: np.ndarray) -> np.dtype:
+    coefficients = np.asarray(coefficients)
+    if coefficients.size == 0:
+        return DTYPES[1]
+    if coefficients.dtype.kind not in "iu" and not is_integral(coefficients):
+        return DTYPES[0]
+    low, high = coefficients.min(), coefficients.max()
+    for code in (1, 2, 3, 4):
+        info = np.iinfo(DTYPES[code])
+        # -info.min is a power of two, so the comparison stays exact for float64 values
+        if info.min <= low and high < -info.min:
+            return DTYPES[code]
+    return DTYPES[0]
+
+
+def as_vector(encrypted_numbers) -> EncryptedVector:
+    if isinstance(encrypted_numbers, EncryptedVector):
+        return encrypted_numbers
+    if isinstance(encrypted_numbers, EncryptedNumber):
+        return EncryptedVector.from_list([encrypted_numbers])
+    return EncryptedVector.from_list(list(encrypted_numbers))
+
+
+# Nonzero coefficients are kept as literal blocks, each preceded by the length
+# of the zero run before it; zeros after the last block are implied by the header.
+# Run lengths are stored in the narrowest unsigned dtype that holds all of them
+def _encode_zero_runs(flat: np.ndarray) -> bytes:
+    nonzero = np.concatenate([[False], flat != 0, [False]])
+    edges = np.flatnonzero(np.diff(nonzero.astype(np.int8)))
+    starts, ends = edges[::2], edges[1::2]
+    zeros_before = starts - np.concatenate([[0], ends[:-1]])
+    runs = np.stack([zeros_before, ends - starts], axis=1)
+    longest = runs.max(initial=0)
+    code = next(code for code, dtype in RUN_DTYPES.items() if longest <= np.iinfo(dtype).max)
+    literals = flat[flat != 0]
+    return struct.pack("<QB", len(runs), code) + runs.astype(RUN_DTYPES[code]).tobytes() + literals.tobytes()
+
+
+# Version 1 buffers have int64 run headers and no run dtype code
+def _decode_zero_runs(buffer, offset: int, header: Header) -> np.ndarray:
+    (run_count,) = struct.unpack_from("<Q", buffer, offset)
+    offset += 8
+    run_dtype = np.dtype("<i8")
+    if header.version > 1:
+        (code,) = struct.unpack_from("<B", buffer, offset)
+        offset += 1
+        if code not in RUN_DTYPES:
+            raise ValueError(f"Unknown run length dtype code: {code}")
+        run_dtype = RUN_DTYPES[code]
+    runs = np.frombuffer(buffer, dtype=run_dtype, count=2 * run_count, offset=offset).reshape(run_count, 2)
+    offset += runs.nbytes
+    runs = runs.astype(np.int64)
+    literal_count = int(runs[:, 1].sum())
+    literals = np.frombuffer(buffer, dtype=header.dtype, count=literal_count, offset=offset)
+
+    zeros_before, lengths = runs[:, 0], runs[:, 1]
+    block_starts = np.cumsum(zeros_before + lengths) - lengths
+    literal_offsets = np.cumsum(lengths) - lengths
+    positions = np.repeat(block_starts - literal_offsets, lengths) + np.arange(literal_count)
+
+    flat = np.zeros(header.count * header.width, dtype=header.dtype)
+    flat[positions] = literals
+    return flat
+
+
+# Coefficients are written in the narrowest exact dtype unless one is given;
+# readers get them back in that dtype and arithmetic widens them to float64.
+# Compression is only applied when it makes the buffer smaller
+def pack(encrypted_numbers: Union[EncryptedVector, List[EncryptedNumber], EncryptedNumber],
+         compress: bool = False, dtype: np.dtype = None) -> bytes:
+    coefficients = as_vector(encrypted_numbers).coefficients
+    required = compact_dtype(coefficients)
+    dtype = required if dtype is None else np.dtype(dtype)
+    if dtype not in DTYPE_CODES:
+        raise ValueError(f"Unsupported coefficient dtype: {dtype}")
+    if np.promote_types(required, dtype) != dtype:
+        raise ValueError(f"Coefficients do not fit into {dtype} exactly")
+    coefficients = np.ascontiguousarray(coefficients, dtype=dtype)
+    header = Header(VERSION, dtype, 0, coefficients.shape[1], coefficients.shape[0])
+
+    if compress:
+        body = _encode_zero_runs(coefficients.ravel())
+        if len(body) < coefficients.nbytes:
+            return header._replace(flags=FLAG_ZERO_RUNS).pack() + body
+    return header.pack() + coefficients.tobytes()
+
+
+# Uncompressed buffers are returned as zero-copy views: the coefficients share
+# memory with the buffer (and are read-only when the buffer is)
+def unpack(buffer) -> EncryptedVector:
+    header = read_header(buffer)
+    if header.flags & FLAG_ZERO_RUNS:
+        flat = _decode_zero_runs(buffer, HEADER_SIZE, header)
+    else:
+        flat = np.frombuffer(buffer, dtype=header.dtype, count=header.count * header.width, offset=HEADER_SIZE)
+    return EncryptedVector(flat.reshape(header.count, header.width))
+
+
+def dump(encrypted_numbers: Union[EncryptedVector, List[EncryptedNumber], EncryptedNumber], path: str,
+         compress: bool = False, dtype: np.dtype = None):
+    with open(path, "wb") as file:
+        file.write(pack(encrypted_numbers, compress, dtype))
+
+
+def load(path: str) -> EncryptedVector:
+    return unpack(np.memmap(path, dtype=np.uint8, mode="r"))
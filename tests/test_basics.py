@@ -1,10 +1,12 @@
+import os
 import sys
+import tempfile
 import unittest
 import logging
 import numpy as np
 
 from homomorphic_polynomial_system.utils import generate_obfuscating_multiplier
-from homomorphic_polynomial_system.keygen import generate_abramov_keypair
+from homomorphic_polynomial_system.keygen import generate_abramov_keypair, AbramovPrivateKey, AbramovPublicKey
 from homomorphic_polynomial_system.vars import ROUND_TO_INT
 
 
@@ -94,6 +96,26 @@ class TestKeypairAttr(unittest.TestCase):
 
         self.assertEqual(self.reference_base, rounded_result)
 
+    def test_keypair_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            private_key_path = os.path.join(directory, "key")
+            public_key_path = os.path.join(directory, "key.pub")
+            self.private_key.save(private_key_path)
+            self.public_key.save(public_key_path)
+
+            private_key = AbramovPrivateKey.load(private_key_path)
+            public_key = AbramovPublicKey.load(public_key_path)
+
+            self.assertEqual(self.private_key.get_root(), private_key.get_root())
+            self.assertEqual(self.public_key.get_base(), public_key.get_base())
+            self.assertEqual(self.public_key.get_polynomial(), public_key.get_polynomial())
+
+            with self.assertRaises(ValueError):
+                AbramovPublicKey.load(private_key_path)
+            # The loaded key maps its file; release the mapping before the directory
+            # is removed, which fails for mapped files on Windows
+            del public_key
+
 
 if __name__ == '__main__':
     # Change logging level from DEBUG to INFO to see less details
@@ -0,0 +1,61 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+import logging
+
+from homomorphic_polynomial_system.benchmark import run, compare, measure, main
+
+
+class TestBenchmark(unittest.TestCase):
+    reference_degrees = (4,)
+    reference_digits = (1, 3)
+
+    @classmethod
+    def setUpClass(cls):  # One quick sweep is shared by all these test cases
+        cls.log = logging.getLogger("TestBenchmark")
+        cls.report = run(cls.reference_degrees, cls.reference_digits, repeat=2, warmup=1, min_time=0.0)
+
+    def test_report_covers_all_operations(self):
+        names = self.report["results"].keys()
+        self.log.debug(f"\nBenchmarks: {list(names)}\n")
+        for operation in ("keygen", "encrypt", "decrypt", "add", "mul", "div", "serialize", "pack"):
+            self.assertTrue(any(name.startswith(operation + "[") for name in names), operation)
+        self.assertEqual(1 + 9 * len(self.reference_digits), len(names))
+
+    def test_statistics(self):
+        stats = measure(lambda: sum(range(100)), repeat=3, warmup=1, min_time=0.001)
+        self.assertEqual(3, stats["repeat"])
+        self.assertLessEqual(stats["min"], stats["median"])
+        self.assertGreaterEqual(stats["stdev"], 0)
+
+    def test_compare_flags_regressions(self):
+        slower = json.loads(json.dumps(self.report))
+        name = next(iter(slower["results"]))
+        slower["results"][name]["median"] *= 2
+
+        comparisons = compare(self.report, slower, tolerance=0.5)
+        regressions = [comparison["name"] for comparison in comparisons if comparison["regression"]]
+        self.assertEqual([name], regressions)
+
+    def test_command_line(self):
+        with tempfile.TemporaryDirectory() as directory:
+            baseline_path = os.path.join(directory, "baseline.json")
+            with open(baseline_path, "w") as file:
+                json.dump(self.report, file)
+
+            self.assertEqual(0, main(["compare", baseline_path, baseline_path]))
+
+            current_path = os.path.join(directory, "current.json")
+            arguments = ["run", "-o", current_path, "--degrees", "4", "--digits", "1", "--repeat", "2",
+                         "--warmup", "0", "--min-time", "0", "--only", "add"]
+            self.assertEqual(0, main(arguments))
+            with open(current_path) as file:
+                self.assertEqual(["add[degree=4,digits=1]"], list(json.load(file)["results"]))
+
+
+if __name__ == '__main__':
+    # Change logging level from DEBUG to INFO to see less details
+    logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+    unittest.main(verbosity=2)
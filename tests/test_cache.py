@@ -0,0 +1,104 @@
+import sys
+import unittest
+import logging
+import pickle
+import numpy as np
+
+from homomorphic_polynomial_system.cache import EncryptionCache
+from homomorphic_polynomial_system.keygen import generate_abramov_keypair
+from homomorphic_polynomial_system.vars import ROUND_TO_INT
+
+
+class TestEncryptionCache(unittest.TestCase):
+    def test_lru_eviction_by_entries(self):
+        cache = EncryptionCache(max_entries=2)
+        cache.put(1, np.ones(3))
+        cache.put(2, np.ones(3))
+        cache.get(1)
+        cache.put(3, np.ones(3))
+        self.assertIn(1, cache)
+        self.assertNotIn(2, cache)
+        self.assertEqual(1, cache.get_stats()["evictions"])
+
+    def test_eviction_by_bytes(self):
+        cache = EncryptionCache(max_bytes=10 * 8)
+        cache.put(1, np.ones(4))
+        cache.put(2, np.ones(4))
+        cache.put(3, np.ones(4))
+        self.assertEqual([2, 3], [key for key in (1, 2, 3) if key in cache])
+        self.assertLessEqual(cache.get_stats()["bytes"], 10 * 8)
+        cache.put(4, np.ones(11))
+        self.assertNotIn(4, cache)
+
+    def test_stats(self):
+        cache = EncryptionCache()
+        self.assertIsNone(cache.get(5))
+        cache.put(5, np.arange(3))
+        cache.get(5)
+        stats = cache.get_stats()
+        self.assertEqual((1, 1, 0.5, 1), (stats["hits"], stats["misses"], stats["hit_rate"], stats["entries"]))
+
+    def test_stored_arrays_are_read_only(self):
+        cache = EncryptionCache()
+        coefficients = np.arange(3.0)
+        stored = cache.put(0, coefficients)
+        coefficients[0] = 7
+        self.assertEqual(0, cache.get(0)[0])
+        with self.assertRaises(ValueError):
+            stored[0] = 1
+
+    def test_pickle(self):
+        cache = EncryptionCache(max_entries=4)
+        cache.put(1, np.ones(2))
+        restored = pickle.loads(pickle.dumps(cache))
+        np.testing.assert_array_equal(np.ones(2), restored.get(1))
+
+
+class TestCachedEncryption(unittest.TestCase):
+    reference_base = 8
+    reference_degree = 4
+
+    @classmethod
+    def setUpClass(cls):  # Keypair will be generated once for all these test cases
+        cls.log = logging.getLogger("TestCachedEncryption")
+        cls.private_key, cls.public_key = \
+            generate_abramov_keypair(cls.reference_base, cls.reference_degree)
+
+    def setUp(self):
+        self.cache = self.public_key.enable_cache(max_entries=8)
+
+    def tearDown(self):
+        self.public_key.disable_cache()
+
+    def test_cached_encryption_matches(self):
+        uncached = [self.public_key.encrypt(number) for number in (0, 1, 42)]
+        self.public_key.disable_cache()
+        for number, encrypted_number in zip((0, 1, 42), uncached):
+            self.assertEqual(self.public_key.encrypt(number).polynomial, encrypted_number.polynomial)
+
+    def test_hits(self):
+        for number in [0, 1, 0, 1, 1, 42, 42]:
+            self.public_key.encrypt(number)
+        stats = self.cache.get_stats()
+
+        self.log.debug(f"\nCache stats: {stats}\n")
+
+        self.assertEqual(3, stats["misses"])
+        self.assertEqual(4, stats["hits"])
+
+    def test_no_aliasing(self):
+        a = self.public_key.encrypt(42)
+        b = self.public_key.encrypt(42)
+        a += self.public_key.encrypt(7)
+        a *= 3
+        a *= b
+        self.assertEqual(42, np.round(self.private_key.decrypt(b), ROUND_TO_INT))
+        self.assertEqual(42, np.round(self.private_key.decrypt(self.public_key.encrypt(42)), ROUND_TO_INT))
+        with self.assertRaises(ValueError):
+            b.coefficients[0] = 0
+
+
+if __name__ == '__main__':
+    # Change logging level from DEBUG to INFO to see less details
+    logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+    unittest.main(verbosity=2)
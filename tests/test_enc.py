@@ -54,6 +54,52 @@ class TestEncryption(unittest.TestCase):
         self.assertEqual(type(encrypted_number), type(deserialized_encrypted_number))
         self.assertEqual(encrypted_number.polynomial, deserialized_encrypted_number.polynomial)
 
+    def test_batch_encryption(self):
+        test_numbers = [0, 1, 7, 42, 63]
+        encrypted_vector = self.public_key.encrypt_many(test_numbers)
+
+        self.log.debug(f"\nCached key powers:\n{self.public_key.get_key_powers(1)}\n")
+
+        self.assertEqual(len(test_numbers), len(encrypted_vector))
+        for number, encrypted_number in zip(test_numbers, encrypted_vector):
+            self.assertEqual(self.public_key.encrypt(number).polynomial, encrypted_number.polynomial)
+
+    def test_batch_decryption(self):
+        test_numbers = [0, 1, 7, 42, 63]
+        encrypted_vector = self.public_key.encrypt_many(test_numbers)
+        encrypted_numbers = encrypted_vector.to_list()
+
+        decrypted_numbers = self.private_key.decrypt_many(encrypted_numbers)
+        decrypted_array = self.private_key.decrypt_many(encrypted_vector.coefficients, as_array=True)
+
+        self.log.debug(f"\nDecrypted values:\n{decrypted_numbers}\n")
+
+        self.assertIsInstance(decrypted_array, np.ndarray)
+        self.assertEqual(test_numbers, list(np.round(decrypted_numbers)))
+        self.assertEqual(test_numbers, list(np.round(decrypted_array)))
+        for number, decrypted_number in zip(encrypted_numbers, decrypted_numbers):
+            self.assertAlmostEqual(self.private_key.decrypt(number), decrypted_number, delta=1e-3)
+
+    def test_vectorized_encoding(self):
+        test_numbers = [197, 0, -197, 8, 2 ** 64 + 3, -(3 ** 50)]
+        digit_matrix = self.public_key.encode_many(test_numbers)
+
+        self.log.debug(f"\nDigit matrix:\n{digit_matrix}\n")
+
+        for number, digits in zip(test_numbers, digit_matrix):
+            recovered = sum(int(digit) * self.reference_base ** i for i, digit in enumerate(digits))
+            self.assertEqual(number, recovered)
+            self.assertTrue(np.all(np.abs(digits) < self.reference_base))
+        np.testing.assert_array_equal(digit_matrix[:3, :3], self.public_key.encode_many(np.array([197, 0, -197])))
+        self.assertEqual(self.public_key.encode(197), np.poly1d(digit_matrix[0][::-1]))
+
+    def test_negative_number_encryption(self):
+        test_numbers = np.array([-1, -42, 42, -63])
+        encrypted_vector = self.public_key.encrypt_many(test_numbers)
+        decrypted_numbers = self.private_key.decrypt_many(encrypted_vector, as_array=True)
+        np.testing.assert_array_equal(test_numbers, np.round(decrypted_numbers))
+        self.assertEqual(-42, np.round(self.private_key.decrypt(self.public_key.encrypt(-42))))
+
 
 if __name__ == '__main__':
     # Change logging level from DEBUG to INFO to see less details
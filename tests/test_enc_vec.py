@@ -0,0 +1,66 @@
+import sys
+import unittest
+import logging
+import numpy as np
+
+from homomorphic_polynomial_system.enc_vec import EncryptedVector
+from homomorphic_polynomial_system.keygen import generate_abramov_keypair
+from homomorphic_polynomial_system.vars import ROUND_TO_INT
+
+
+class TestEncryptedVector(unittest.TestCase):
+    reference_base = 7
+    reference_degree = 8
+
+    @classmethod
+    def setUpClass(cls):  # Keypair will be generated once for all these test cases
+        cls.log = logging.getLogger("TestEncryptedVector")
+        cls.private_key, cls.public_key = \
+            generate_abramov_keypair(cls.reference_base, cls.reference_degree)
+
+        cls.test_numbers1 = [3, 5, 12, 0, 48]
+        cls.test_numbers2 = [5, 2, 30, 7, 1]
+        cls.encrypted_vector1 = EncryptedVector.from_list([cls.public_key.encrypt(n) for n in cls.test_numbers1])
+        cls.encrypted_vector2 = EncryptedVector.from_list([cls.public_key.encrypt(n) for n in cls.test_numbers2])
+
+    def decrypt(self, encrypted_vector):
+        return [np.round(self.private_key.decrypt(number), ROUND_TO_INT) for number in encrypted_vector.to_list()]
+
+    def test_list_round_trip(self):
+        encrypted_numbers = [self.public_key.encrypt(n) for n in self.test_numbers1]
+        restored = EncryptedVector.from_list(encrypted_numbers).to_list()
+        for number, restored_number in zip(encrypted_numbers, restored):
+            self.assertEqual(number.polynomial, restored_number.polynomial)
+
+    def test_addition(self):
+        reference = [a + b for a, b in zip(self.test_numbers1, self.test_numbers2)]
+        self.assertEqual(reference, self.decrypt(self.encrypted_vector1 + self.encrypted_vector2))
+
+    def test_subtraction(self):
+        reference = [a - b for a, b in zip(self.test_numbers1, self.test_numbers2)]
+        self.assertEqual(reference, self.decrypt(self.encrypted_vector1 - self.encrypted_vector2))
+
+    def test_multiplication(self):
+        reference = [a * b for a, b in zip(self.test_numbers1, self.test_numbers2)]
+        product = self.encrypted_vector1 * self.encrypted_vector2
+        self.log.debug(f"\nProduct width: {product.get_width()}\n")
+        self.assertEqual(reference, self.decrypt(product))
+
+    def test_multiplication_matches_encrypted_numbers(self):
+        product = self.encrypted_vector1 * self.encrypted_vector2
+        for a, b, c in zip(self.encrypted_vector1, self.encrypted_vector2, product):
+            np.testing.assert_allclose((a * b).polynomial.coef, c.polynomial.coef, rtol=1e-12)
+
+    def test_sum(self):
+        decrypted_sum = self.private_key.decrypt(self.encrypted_vector1.sum())
+        self.assertEqual(sum(self.test_numbers1), np.round(decrypted_sum, ROUND_TO_INT))
+
+    def test_length_mismatch(self):
+        with self.assertRaises(ValueError):
+            self.encrypted_vector1 + self.encrypted_vector2[:2]
+
+
+if __name__ == '__main__':
+    # Change logging level from DEBUG to INFO to see less details
+    logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+    unittest.main(verbosity=2)
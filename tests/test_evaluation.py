@@ -0,0 +1,79 @@
+import sys
+import unittest
+import logging
+import math
+import numpy as np
+
+from homomorphic_polynomial_system import instrumentation
+from homomorphic_polynomial_system.evaluation import evaluate_polynomial, PowerCache
+from homomorphic_polynomial_system.keygen import generate_abramov_keypair
+from homomorphic_polynomial_system.vars import ROUND_TO_INT
+
+
+class TestPolynomialEvaluation(unittest.TestCase):
+    reference_base = 8
+    reference_degree = 4
+
+    @classmethod
+    def setUpClass(cls):  # Keypair will be generated once for all these test cases
+        cls.log = logging.getLogger("TestPolynomialEvaluation")
+        cls.private_key, cls.public_key = \
+            generate_abramov_keypair(cls.reference_base, cls.reference_degree)
+        cls.test_number = 2
+        cls.encrypted_number = cls.public_key.encrypt(cls.test_number)
+
+    def decrypt(self, encrypted_number):
+        return np.round(self.private_key.decrypt(encrypted_number), ROUND_TO_INT)
+
+    def count_multiplications(self, function):
+        with instrumentation.recording() as snapshot:
+            result = function()
+        stats = snapshot()
+        return result, sum(stats[name]["count"] for name in ("mul", "imul") if name in stats)
+
+    def test_evaluation(self):
+        for coeffs in ([7], [1, 3], [3, 0, -1], [2, -1, 0, 1, 1, -3, 0, 1]):
+            reference = np.polyval(coeffs[::-1], self.test_number)
+            encrypted_result = evaluate_polynomial(self.encrypted_number, coeffs)
+            self.log.debug(f"\nCoefficients: {coeffs}, reference: {reference}\n")
+            self.assertEqual(reference, self.decrypt(encrypted_result))
+
+    def test_poly1d_coefficients(self):
+        polynomial = np.poly1d([1, -2, 0, 5])
+        encrypted_result = evaluate_polynomial(self.encrypted_number, polynomial)
+        self.assertEqual(polynomial(self.test_number), self.decrypt(encrypted_result))
+
+    def test_multiplication_count(self):
+        coeffs = [1, -1] * 6
+        encrypted_result, multiplications = self.count_multiplications(
+            lambda: evaluate_polynomial(self.encrypted_number, coeffs))
+
+        self.log.debug(f"\nCiphertext multiplications: {multiplications}\n")
+
+        self.assertLessEqual(multiplications, 2 * math.isqrt(len(coeffs)) + 1)
+        self.assertLess(multiplications, len(coeffs) - 1)
+        self.assertEqual(np.polyval(coeffs[::-1], self.test_number), self.decrypt(encrypted_result))
+
+    def test_power_cache_reuse(self):
+        powers = PowerCache(self.encrypted_number)
+        evaluate_polynomial(powers, [1, 2, 3, 4, 5])
+        cached_powers = len(powers)
+        encrypted_result, multiplications = self.count_multiplications(
+            lambda: evaluate_polynomial(powers, [5, 4, 3, 2]))
+        self.assertEqual(cached_powers, len(powers))
+        self.assertEqual(0, multiplications)
+        self.assertEqual(5 + 4 * 2 + 3 * 4 + 2 * 8, self.decrypt(encrypted_result))
+
+    def test_real_coefficients(self):
+        coeffs = [0.5, -1.25, 0.375, 2.5, -0.125]
+        reference = np.polyval(coeffs[::-1], self.test_number)
+        encrypted_result = evaluate_polynomial(self.encrypted_number, np.array(coeffs))
+        self.assertAlmostEqual(reference, self.private_key.decrypt(encrypted_result), places=6)
+        with self.assertRaises(TypeError):
+            evaluate_polynomial(self.encrypted_number, [1, 0.5j])
+
+
+if __name__ == '__main__':
+    # Change logging level from DEBUG to INFO to see less details
+    logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+    unittest.main(verbosity=2)
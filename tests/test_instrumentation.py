@@ -0,0 +1,74 @@
+import sys
+import unittest
+import logging
+
+from homomorphic_polynomial_system import instrumentation
+from homomorphic_polynomial_system.keygen import generate_abramov_keypair
+
+
+class TestInstrumentation(unittest.TestCase):
+    reference_base = 7
+    reference_degree = 8
+
+    @classmethod
+    def setUpClass(cls):  # Keypair will be generated once for all these test cases
+        cls.log = logging.getLogger("TestInstrumentation")
+        cls.private_key, cls.public_key = \
+            generate_abramov_keypair(cls.reference_base, cls.reference_degree)
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.reset()
+
+    def test_disabled_by_default(self):
+        self.public_key.encrypt(5) + self.public_key.encrypt(6)
+        self.assertFalse(instrumentation.is_enabled())
+        self.assertEqual({}, instrumentation.snapshot())
+
+    def test_recording(self):
+        with instrumentation.recording() as snapshot:
+            a = self.public_key.encrypt(56)
+            b = self.public_key.encrypt(112)
+            product = a * b
+            self.private_key.decrypt(product)
+            stats = snapshot()
+
+        self.log.debug(f"\nSnapshot: {stats}\n")
+
+        self.assertFalse(instrumentation.is_enabled())
+        self.assertEqual(2, stats["encrypt"]["count"])
+        self.assertEqual(1, stats["mul"]["count"])
+        self.assertEqual(a.polynomial.order, stats["mul"]["max_operand_degree"])
+        self.assertEqual(product.polynomial.order, stats["mul"]["max_result_degree"])
+        self.assertEqual(max(abs(product.polynomial.coef)), stats["mul"]["max_coefficient"])
+        self.assertEqual(product.polynomial.order, stats["decrypt"]["max_operand_degree"])
+        self.assertGreater(stats["mul"]["total_time"], 0)
+
+    def test_hooks(self):
+        events = []
+        with instrumentation.recording(events.append):
+            self.public_key.encrypt(5) - self.public_key.encrypt(6)
+        self.public_key.encrypt(7)
+
+        self.assertEqual(["encrypt", "encrypt", "sub"], [event["operation"] for event in events])
+
+    def test_division_result_degree(self):
+        with instrumentation.recording() as snapshot:
+            self.public_key.encrypt(56) / self.public_key.encrypt(3)
+        self.assertEqual(1, snapshot()["div"]["count"])
+
+    # / and divmod() share their work, but each call is recorded once, under its own name
+    def test_division_is_counted_once(self):
+        a, b = self.public_key.encrypt(560), self.public_key.encrypt(31)
+        with instrumentation.recording() as snapshot:
+            a / b
+            divmod(a, b)
+            stats = snapshot()
+        self.assertEqual(1, stats["div"]["count"])
+        self.assertEqual(1, stats["divmod"]["count"])
+
+
+if __name__ == '__main__':
+    # Change logging level from DEBUG to INFO to see less details
+    logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+    unittest.main(verbosity=2)
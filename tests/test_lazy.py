@@ -0,0 +1,104 @@
+import sys
+import unittest
+import logging
+import numpy as np
+
+from homomorphic_polynomial_system.enc_num import EncryptedNumber
+from homomorphic_polynomial_system.keygen import generate_abramov_keypair
+from homomorphic_polynomial_system.lazy import lazy, evaluate, ExpressionGraph
+from homomorphic_polynomial_system.vars import REDUCE_ALWAYS
+
+
+class TestLazyEvaluation(unittest.TestCase):
+    reference_base = 7
+    reference_degree = 8
+
+    @classmethod
+    def setUpClass(cls):  # Keypair will be generated once for all these test cases
+        cls.log = logging.getLogger("TestLazyEvaluation")
+        cls.private_key, cls.public_key = \
+            generate_abramov_keypair(cls.reference_base, cls.reference_degree)
+
+        cls.test_numbers = [2, 3, 5]
+        cls.encrypted_numbers = [cls.public_key.encrypt(number) for number in cls.test_numbers]
+
+    def test_matches_eager_evaluation(self):
+        a, b, c = self.encrypted_numbers
+        x, y, z = lazy(a, b, c)
+        eager = a * b + c * a - b + a * b
+        deferred = (x * y + z * x - y + x * y).evaluate()
+
+        self.log.debug(f"\nEager result:\n{eager}\n")
+        self.log.debug(f"\nDeferred result:\n{deferred}\n")
+
+        np.testing.assert_allclose(eager.polynomial.coef, deferred.polynomial.coef)
+
+    def test_common_subexpressions_are_shared(self):
+        graph = ExpressionGraph()
+        x, y = lazy(*self.encrypted_numbers[:2], graph=graph)
+        self.assertIs(x * y, y * x)
+        self.assertIs(x + y, y + x)
+        self.assertIsNot(x - y, y - x)
+        self.assertIs(graph.leaf(self.encrypted_numbers[0]), x)
+
+    def test_product_reordering(self):
+        a, b, c = self.encrypted_numbers
+        x, y, z = lazy(a, b, c)
+        deferred = ((x * y) * (z * x)).evaluate()
+        np.testing.assert_allclose((a * b * c * a).polynomial.coef, deferred.polynomial.coef)
+
+    def test_cancelling_terms(self):
+        x, y = lazy(*self.encrypted_numbers[:2])
+        self.assertEqual(np.poly1d(0), (x * y - y * x).evaluate().polynomial)
+
+    def test_several_outputs(self):
+        x, y, z = lazy(*self.encrypted_numbers)
+        shared = x * y
+        first, second = evaluate(shared + z, shared - z)
+        a, b, c = self.test_numbers
+        self.assertEqual(a * b + c, np.round(self.private_key.decrypt(first)))
+        self.assertEqual(a * b - c, np.round(self.private_key.decrypt(second)))
+
+    def test_mixed_graphs(self):
+        x, = lazy(self.encrypted_numbers[0])
+        y, = lazy(self.encrypted_numbers[1])
+        with self.assertRaises(ValueError):
+            x + y
+
+    # Thousands of chained operations must not hit the recursion limit
+    def test_long_chains(self):
+        leaves = lazy(*(self.encrypted_numbers * 1000))
+        total = chain = leaves[0]
+        for leaf in leaves[1:]:
+            total = total + leaf
+            chain = (chain + leaf) * 1
+
+        expected = 1000 * sum(self.test_numbers)
+        self.assertEqual(expected, np.round(self.private_key.decrypt(total.evaluate())))
+        self.assertEqual(expected, np.round(self.private_key.decrypt(chain.evaluate())))
+
+    def test_integer_constants(self):
+        x, y = lazy(*self.encrypted_numbers[:2])
+        a, b = self.test_numbers[:2]
+        self.assertIs(x + 3, 3 + x)
+        deferred = (2 * x * y + 5 - y).evaluate()
+        self.assertEqual(2 * a * b + 5 - b, np.round(self.private_key.decrypt(deferred)))
+        self.assertEqual(7 - a, np.round(self.private_key.decrypt((7 - x).evaluate())))
+        with self.assertRaises(TypeError):
+            x + 1.5
+
+    def test_reducer_is_kept(self):
+        reducer = self.public_key.get_reducer(REDUCE_ALWAYS)
+        a, b = (EncryptedNumber.from_coefficients(number.coefficients, reducer) for number in self.encrypted_numbers[:2])
+        x, y = lazy(a, b)
+        eager = a * b + a
+        deferred = (x * y + x).evaluate()
+        self.assertIs(reducer, deferred.reducer)
+        self.assertLessEqual(deferred.polynomial.order, reducer.get_degree())
+        np.testing.assert_allclose(eager.coefficients, deferred.coefficients)
+
+
+if __name__ == '__main__':
+    # Change logging level from DEBUG to INFO to see less details
+    logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+    unittest.main(verbosity=2)
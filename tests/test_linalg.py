@@ -0,0 +1,85 @@
+import sys
+import unittest
+import logging
+import numpy as np
+
+from homomorphic_polynomial_system import linalg
+from homomorphic_polynomial_system.enc_num import EncryptedNumber
+from homomorphic_polynomial_system.keygen import generate_abramov_keypair
+from homomorphic_polynomial_system.vars import ROUND_TO_INT
+
+
+class TestLinearAlgebra(unittest.TestCase):
+    reference_base = 8
+    reference_degree = 4
+
+    @classmethod
+    def setUpClass(cls):  # Keypair will be generated once for all these test cases
+        cls.log = logging.getLogger("TestLinearAlgebra")
+        cls.private_key, cls.public_key = \
+            generate_abramov_keypair(cls.reference_base, cls.reference_degree)
+
+        cls.features = [3, 1, 4, 1, 5]
+        cls.weights = np.array([[2, 0, 1, -1, 3],
+                                [1, 1, 1, 1, 1],
+                                [0, -2, 5, 0, 1]])
+        cls.encrypted_features = cls.public_key.encrypt_many(cls.features)
+        cls.encrypted_weights = [cls.public_key.encrypt_many(row) for row in cls.weights]
+
+    def decrypt(self, encrypted_vector):
+        return list(np.round(self.private_key.decrypt_many(encrypted_vector), ROUND_TO_INT))
+
+    def test_dot(self):
+        reference = int(np.dot(self.features, self.features))
+        encrypted_numbers = self.encrypted_features.to_list()
+        cases = [
+            linalg.dot(self.encrypted_features, self.encrypted_features),
+            linalg.dot(encrypted_numbers, self.encrypted_features),
+            linalg.dot(self.encrypted_features, self.features),
+            linalg.dot(self.features, encrypted_numbers),
+        ]
+        for encrypted_result in cases:
+            self.assertIsInstance(encrypted_result, EncryptedNumber)
+            self.assertEqual(reference, np.round(self.private_key.decrypt(encrypted_result), ROUND_TO_INT))
+
+    def test_dot_matches_loop(self):
+        reference = EncryptedNumber()
+        for a, b in zip(self.encrypted_features, self.encrypted_weights[0]):
+            reference += a * b
+        result = linalg.dot(self.encrypted_features, self.encrypted_weights[0])
+        np.testing.assert_array_equal(reference.coefficients, result.coefficients)
+
+    def test_matvec(self):
+        reference = list(self.weights @ self.features)
+        self.assertEqual(reference, self.decrypt(linalg.matvec(self.weights, self.encrypted_features)))
+        self.assertEqual(reference, self.decrypt(linalg.matvec(self.encrypted_weights, self.features)))
+        self.assertEqual(reference, self.decrypt(linalg.matvec(self.encrypted_weights, self.encrypted_features)))
+
+    def test_mixed_entries(self):
+        mixed = [self.public_key.encrypt(3), 1, self.public_key.encrypt(4), 1, 5]
+        reference = list(self.weights @ self.features)
+        self.assertEqual(reference, self.decrypt(linalg.matvec(self.weights, mixed)))
+
+    def test_matmul(self):
+        right = np.arange(10).reshape(5, 2) % 3
+        reference = self.weights @ right
+        encrypted_right = [self.public_key.encrypt_many(row) for row in right]
+        product = linalg.matmul(self.encrypted_weights, encrypted_right)
+
+        self.log.debug(f"\nProduct width: {product[0].get_width()}\n")
+
+        self.assertEqual(len(reference), len(product))
+        for reference_row, row in zip(reference, product):
+            self.assertEqual(list(reference_row), self.decrypt(row))
+
+    def test_dimension_mismatch(self):
+        with self.assertRaises(ValueError):
+            linalg.dot(self.encrypted_features, self.features[:3])
+        with self.assertRaises(ValueError):
+            linalg.matvec(self.weights.T, self.encrypted_features)
+
+
+if __name__ == '__main__':
+    # Change logging level from DEBUG to INFO to see less details
+    logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+    unittest.main(verbosity=2)
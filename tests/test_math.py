@@ -3,8 +3,9 @@ import unittest
 import logging
 import numpy as np
 
+from homomorphic_polynomial_system.enc_num import EncryptedNumber
 from homomorphic_polynomial_system.keygen import generate_abramov_keypair
-from homomorphic_polynomial_system.vars import ROUND_TO_INT, ROUND_TO_REAL_NUMBERS
+from homomorphic_polynomial_system.vars import ROUND_TO_INT, ROUND_TO_REAL_NUMBERS, REDUCE_ABOVE_THRESHOLD
 
 
 class TestMath(unittest.TestCase):
@@ -128,6 +129,155 @@ class TestMath(unittest.TestCase):
 
         self.assertEqual(rounded_division_result, rounded_dec_division_result)
 
+    def test_divmod(self):
+        quotient, remainder = divmod(self.encrypted_number2, self.encrypted_small_number2)
+        whole_part, remains, divider = self.encrypted_number2 / self.encrypted_small_number2
+        self.assertEqual(whole_part.polynomial, quotient.polynomial)
+        self.assertEqual(remains.polynomial, remainder.polynomial)
+
+        # numerator == quotient * divider + remainder holds on the polynomials themselves
+        recombined = quotient * self.encrypted_small_number2 + remainder
+        np.testing.assert_allclose(self.encrypted_number2.coefficients, recombined.coefficients,
+                                   rtol=1e-9, atol=1e-6)
+
+    def test_division_by_zero(self):
+        with self.assertRaises(ZeroDivisionError):
+            divmod(self.encrypted_number1, EncryptedNumber())
+
+    # Division is only defined between ciphertexts
+    def test_division_by_plaintext(self):
+        with self.assertRaises(TypeError):
+            self.encrypted_number1 / 3
+        with self.assertRaises(TypeError):
+            divmod(self.encrypted_number1, 3)
+
+    # Decryption is linear in the coefficients: a scalar added to the constant
+    # term is added to the plaintext and scaled coefficients scale it, so the
+    # scalar paths are checked on coefficients instead of through a rounded decryption
+    def test_plaintext_scalar_operations(self):
+        scalar = 5
+        coefficients = self.encrypted_number1.coefficients
+        shifted = coefficients.copy()
+        shifted[0] += scalar
+        reduced = coefficients.copy()
+        reduced[0] -= scalar
+        reflected = -coefficients
+        reflected[0] += scalar
+        cases = [
+            (shifted, self.encrypted_number1 + scalar),
+            (shifted, scalar + self.encrypted_number1),
+            (reduced, self.encrypted_number1 - scalar),
+            (reflected, scalar - self.encrypted_number1),
+            (scalar * coefficients, self.encrypted_number1 * scalar),
+            (scalar * coefficients, scalar * self.encrypted_number1),
+            (-coefficients, -self.encrypted_number1),
+        ]
+        for expected, encrypted_result in cases:
+            self.log.debug(f"\nExpected coefficients: {expected}, actual: {encrypted_result.coefficients}\n")
+            np.testing.assert_array_equal(expected, encrypted_result.coefficients)
+
+    def test_scalar_multiplication_keeps_degree(self):
+        product = self.encrypted_number1 * 3
+        self.assertEqual(self.encrypted_number1.polynomial.order, product.polynomial.order)
+        np.testing.assert_array_equal(3 * self.encrypted_number1.polynomial.coef, product.polynomial.coef)
+
+    def test_weighted_sum(self):
+        weights = [3, -2, 7, 1]
+        numbers = [self.encrypted_number1, self.encrypted_number2, self.encrypted_small_number1,
+                   self.encrypted_small_number2]
+        plain_numbers = [self.test_number1, self.test_number2, self.test_small_number1, self.test_small_number2]
+
+        encrypted_sum = EncryptedNumber()
+        for weight, encrypted_number in zip(weights, numbers):
+            encrypted_sum += encrypted_number * weight
+        encrypted_sum += 10
+
+        reference = sum(weight * number for weight, number in zip(weights, plain_numbers)) + 10
+        self.assertEqual(reference, np.round(self.private_key.decrypt(encrypted_sum), ROUND_TO_INT))
+
+    def test_unsupported_operand(self):
+        with self.assertRaises(TypeError):
+            self.encrypted_number1 + 1.5
+
+
+class TestInPlaceOperators(unittest.TestCase):
+    reference_base = 7
+    reference_degree = 8
+
+    @classmethod
+    def setUpClass(cls):  # Keypair will be generated once for all these test cases
+        cls.log = logging.getLogger("TestInPlaceOperators")
+        cls.private_key, cls.public_key = \
+            generate_abramov_keypair(cls.reference_base, cls.reference_degree)
+        cls.test_numbers = [5, 56, 112, 3, 48]
+        cls.encrypted_numbers = [cls.public_key.encrypt(number) for number in cls.test_numbers]
+
+    def test_compact_representation(self):
+        encrypted_number = self.encrypted_numbers[1]
+        self.assertFalse(hasattr(encrypted_number, "__dict__"))
+        np.testing.assert_array_equal(encrypted_number.polynomial.coef[::-1], encrypted_number.coefficients)
+        self.assertEqual(encrypted_number.polynomial.order, encrypted_number.degree)
+
+    def test_accumulation_matches_addition(self):
+        accumulator = EncryptedNumber()
+        reference = EncryptedNumber()
+        for encrypted_number in self.encrypted_numbers:
+            accumulator += encrypted_number
+            reference = reference + encrypted_number
+        self.assertEqual(reference.polynomial, accumulator.polynomial)
+        self.assertGreaterEqual(accumulator.capacity(), accumulator.degree + 1)
+
+    def test_accumulator_reuses_buffer(self):
+        accumulator = EncryptedNumber.from_coefficients(np.zeros(64))
+        buffer_id = id(accumulator._buffer)
+        for encrypted_number in self.encrypted_numbers:
+            accumulator += encrypted_number
+            accumulator -= encrypted_number
+            accumulator += encrypted_number
+        self.assertEqual(buffer_id, id(accumulator._buffer))
+
+    def test_in_place_subtraction_and_multiplication(self):
+        a, b = self.encrypted_numbers[0], self.encrypted_numbers[3]
+        difference = EncryptedNumber.from_coefficients(a.coefficients)
+        difference -= b
+        product = EncryptedNumber.from_coefficients(a.coefficients)
+        product *= b
+        self.assertEqual((a - b).polynomial, difference.polynomial)
+        self.assertEqual((a * b).polynomial, product.polynomial)
+        self.assertEqual(self.test_numbers[0] - self.test_numbers[3],
+                         np.round(self.private_key.decrypt(difference), ROUND_TO_INT))
+
+    def test_cancellation_trims_degree(self):
+        accumulator = EncryptedNumber.from_coefficients(self.encrypted_numbers[2].coefficients)
+        accumulator -= self.encrypted_numbers[2]
+        self.assertEqual(0, accumulator.degree)
+        self.assertEqual(np.poly1d(0), accumulator.polynomial)
+
+    def test_read_only_buffer_is_copied(self):
+        coefficients = self.encrypted_numbers[1].coefficients.copy()
+        coefficients.flags.writeable = False
+        shared = EncryptedNumber.from_coefficients(coefficients, copy=False)
+        shared += self.encrypted_numbers[0]
+        np.testing.assert_array_equal(self.encrypted_numbers[1].coefficients, coefficients)
+
+    # A plaintext below the base encrypts to a constant, which reduce() leaves as it is
+    def test_reduce_does_not_alias(self):
+        reducer = self.public_key.get_reducer()
+        encrypted_number = EncryptedNumber.from_coefficients(self.encrypted_numbers[3].coefficients, reducer)
+        reduced = encrypted_number.reduce()
+        self.assertFalse(np.shares_memory(encrypted_number._buffer, reduced._buffer))
+        reduced += self.encrypted_numbers[0]
+        np.testing.assert_array_equal(self.encrypted_numbers[3].coefficients, encrypted_number.coefficients)
+
+    def test_reducing_accumulator_keeps_capacity(self):
+        reducer = self.public_key.get_reducer(REDUCE_ABOVE_THRESHOLD, 4 * self.reference_degree)
+        accumulator = EncryptedNumber.from_coefficients(np.zeros(64), reducer)
+        buffer_id = id(accumulator._buffer)
+        for encrypted_number in self.encrypted_numbers:
+            accumulator += encrypted_number
+        self.assertEqual(64, accumulator.capacity())
+        self.assertEqual(buffer_id, id(accumulator._buffer))
+
 
 if __name__ == '__main__':
     # Change logging level from DEBUG to INFO to see less details
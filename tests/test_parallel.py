@@ -0,0 +1,119 @@
+import sys
+import unittest
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest import mock
+
+import numpy as np
+
+from homomorphic_polynomial_system import parallel
+from homomorphic_polynomial_system.enc_num import EncryptedNumber
+from homomorphic_polynomial_system.keygen import generate_abramov_keypair, AbramovPublicKey
+from homomorphic_polynomial_system.parallel import parallel_sum, parallel_product, parallel_map
+from homomorphic_polynomial_system.vars import ROUND_TO_INT, REDUCE_ALWAYS
+
+
+def square(encrypted_number: EncryptedNumber) -> EncryptedNumber:
+    return encrypted_number * encrypted_number
+
+
+@mock.patch.object(parallel, "PARALLEL_MIN_CHUNK", 4)
+class TestParallelReductions(unittest.TestCase):
+    reference_base = 7
+    reference_degree = 8
+
+    @classmethod
+    def setUpClass(cls):  # Keypair and pool will be created once for all these test cases
+        cls.log = logging.getLogger("TestParallelReductions")
+        cls.private_key, cls.public_key = \
+            generate_abramov_keypair(cls.reference_base, cls.reference_degree)
+        cls.executor = ProcessPoolExecutor(max_workers=2)
+
+        cls.test_numbers = list(range(1, 22))
+        cls.encrypted_numbers = [cls.public_key.encrypt(number) for number in cls.test_numbers]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.executor.shutdown()
+
+    def test_sum(self):
+        encrypted_sum = parallel_sum(self.encrypted_numbers, self.executor)
+        self.assertEqual(sum(self.test_numbers), np.round(self.private_key.decrypt(encrypted_sum), ROUND_TO_INT))
+
+    def test_sum_with_own_pool(self):
+        encrypted_sum = parallel_sum(self.encrypted_numbers, workers=2)
+        self.assertEqual(sum(self.test_numbers), np.round(self.private_key.decrypt(encrypted_sum), ROUND_TO_INT))
+
+    def test_product(self):
+        encrypted_numbers = self.encrypted_numbers[:6]
+        reference = encrypted_numbers[0]
+        for encrypted_number in encrypted_numbers[1:]:
+            reference = reference * encrypted_number
+        encrypted_product = parallel_product(encrypted_numbers, self.executor)
+        np.testing.assert_allclose(reference.polynomial.coef, encrypted_product.polynomial.coef)
+
+    def test_map(self):
+        squares = parallel_map(square, self.encrypted_numbers, self.executor)
+        self.assertEqual(len(self.encrypted_numbers), len(squares))
+        for encrypted_number, encrypted_square in zip(self.encrypted_numbers, squares):
+            self.assertEqual(square(encrypted_number).polynomial, encrypted_square.polynomial)
+
+    def test_small_input_stays_serial(self):
+        encrypted_sum = parallel_sum(self.encrypted_numbers[:3])
+        self.assertEqual(6, np.round(self.private_key.decrypt(encrypted_sum), ROUND_TO_INT))
+
+
+# Records the functions it runs, so tests can tell which steps went to the executor
+class RecordingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.functions = []
+
+    def map(self, fn, *iterables, **kwargs):
+        self.functions.append(fn)
+        return super().map(fn, *iterables, **kwargs)
+
+
+@mock.patch.object(parallel, "PARALLEL_MIN_CHUNK", 4)
+class TestParallelReduction(unittest.TestCase):
+    reference_base = 7
+
+    # Fixed key with small coefficients (see test_reduction), so that products
+    # stay exact and every reduction leaves the constant plaintext
+    def setUp(self):
+        key_polynomial = np.poly1d([2, 1]) * np.poly1d([1, 0, 0, 0, 2]) * np.poly1d([3, 0, 5]) + self.reference_base
+        self.public_key = AbramovPublicKey(self.reference_base, key_polynomial)
+        self.public_key.set_reduction_policy(REDUCE_ALWAYS)
+        self.test_numbers = list(range(7, 17))
+        self.encrypted_numbers = [self.public_key.encrypt(number) for number in self.test_numbers]
+        self.executor = RecordingExecutor()
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_product_keeps_reducer(self):
+        encrypted_product = parallel_product(self.encrypted_numbers, self.executor, workers=2)
+        self.assertIs(self.encrypted_numbers[0].reducer, encrypted_product.reducer)
+        self.assertEqual([np.prod(self.test_numbers)], list(encrypted_product.coefficients))
+
+    def test_product_tree_runs_in_executor(self):
+        parallel_product(self.encrypted_numbers, self.executor, workers=2)
+        self.assertEqual(parallel._product_task, self.executor.functions[0])
+        self.assertIn(parallel._multiply_pair, self.executor.functions[1:])
+
+    def test_sum_keeps_reducer(self):
+        encrypted_sum = parallel_sum(self.encrypted_numbers, self.executor)
+        self.assertIs(self.encrypted_numbers[0].reducer, encrypted_sum.reducer)
+        self.assertEqual([sum(self.test_numbers)], list(encrypted_sum.coefficients))
+
+    def test_map_keeps_reducer(self):
+        squares = parallel_map(square, self.encrypted_numbers, self.executor)
+        for number, encrypted_number, encrypted_square in zip(self.test_numbers, self.encrypted_numbers, squares):
+            self.assertIs(encrypted_number.reducer, encrypted_square.reducer)
+            self.assertEqual([number * number], list(encrypted_square.coefficients))
+
+
+if __name__ == '__main__':
+    # Change logging level from DEBUG to INFO to see less details
+    logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+    unittest.main(verbosity=2)
@@ -0,0 +1,209 @@
+import sys
+import unittest
+import logging
+from unittest import mock
+import numpy as np
+
+from homomorphic_polynomial_system import polymath
+from homomorphic_polynomial_system.polymath import multiply, fft_multiply, fft_is_exact, \
+    multiply_batch, fft_multiply_batch, schoolbook_multiply_batch, product_tree, \
+    series_inverse, fast_divmod, divide, division_is_accurate, is_well_conditioned, \
+    matmul, schoolbook_matmul, fft_matmul, convolve_matmul, \
+    karatsuba_multiply, get_thresholds, set_thresholds, reset_thresholds
+from homomorphic_polynomial_system.keygen import generate_abramov_keypair
+from homomorphic_polynomial_system.vars import FFT_MULTIPLICATION_THRESHOLD, FAST_DIVISION_THRESHOLD
+
+
+class TestMultiplication(unittest.TestCase):
+    reference_length = 2 * FFT_MULTIPLICATION_THRESHOLD
+
+    def setUp(self):
+        self.log = logging.getLogger("TestMultiplication")
+        rng = np.random.default_rng()
+        self.a = rng.integers(-100, 100, self.reference_length).astype(np.float64)
+        self.b = rng.integers(-100, 100, self.reference_length + 17).astype(np.float64)
+
+    def test_fft_matches_schoolbook(self):
+        self.assertTrue(fft_is_exact(self.a, self.b))
+        np.testing.assert_array_equal(np.convolve(self.a, self.b), fft_multiply(self.a, self.b))
+
+    def test_dispatch_matches_schoolbook(self):
+        np.testing.assert_array_equal(np.convolve(self.a, self.b), multiply(self.a, self.b))
+
+    def test_small_operands_stay_exact(self):
+        a = np.array([0.5, 1.25, 3.0])
+        b = np.array([2.0, 0.1])
+        np.testing.assert_array_equal(np.convolve(a, b), multiply(a, b))
+
+    def test_non_integral_operands_are_not_fft_exact(self):
+        self.assertFalse(fft_is_exact(self.a + 0.5, self.b))
+
+    def test_huge_coefficients_are_not_fft_exact(self):
+        self.assertFalse(fft_is_exact(self.a * 2.0 ** 30, self.b * 2.0 ** 10))
+
+
+class TestKaratsuba(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(24)
+
+    def tearDown(self):
+        reset_thresholds()
+
+    def test_matches_schoolbook(self):
+        for length_a, length_b in ((64, 64), (100, 37), (257, 3), (1, 1)):
+            a = self.rng.integers(-99, 100, length_a).astype(np.float64)
+            b = self.rng.integers(-99, 100, length_b).astype(np.float64)
+            for threshold in (2, 8, 32):
+                np.testing.assert_array_equal(np.convolve(a, b), karatsuba_multiply(a, b, threshold))
+
+    def test_dispatch_uses_thresholds(self):
+        a = self.rng.integers(-9, 10, 300).astype(np.float64) * 2.0 ** 30
+        b = self.rng.integers(-9, 10, 200).astype(np.float64) * 2.0 ** 20
+        set_thresholds(karatsuba=16, fft=16)
+        self.assertEqual({"karatsuba": 16, "fft": 16}, get_thresholds())
+        # Too large for an exact FFT, so the Karatsuba path is taken
+        np.testing.assert_allclose(np.convolve(a, b), multiply(a, b), rtol=1e-12)
+        small_a, small_b = a[:40] / 2.0 ** 30, b[:40] / 2.0 ** 20
+        np.testing.assert_array_equal(np.convolve(small_a, small_b), multiply(small_a, small_b))
+
+    # Batch and matrix products follow the same tuned FFT threshold as multiply
+    def test_batch_dispatch_uses_thresholds(self):
+        a = self.rng.integers(-9, 10, (3, 2, 40)).astype(np.float64)
+        b = self.rng.integers(-9, 10, (2, 3, 40)).astype(np.float64)
+        set_thresholds(fft=64)
+        with mock.patch.object(polymath, "fft_multiply_batch", side_effect=AssertionError("FFT used")), \
+                mock.patch.object(polymath, "fft_matmul", side_effect=AssertionError("FFT used")):
+            multiply_batch(a[0], b[:, 0])
+            matmul(a, b)
+        set_thresholds(fft=16)
+        with mock.patch.object(polymath, "schoolbook_multiply_batch", side_effect=AssertionError("FFT skipped")), \
+                mock.patch.object(polymath, "schoolbook_matmul", side_effect=AssertionError("FFT skipped")):
+            multiply_batch(a[0], b[:, 0])
+            matmul(a, b)
+
+
+class TestBatchMultiplication(unittest.TestCase):
+    reference_rows = 5
+
+    def setUp(self):
+        rng = np.random.default_rng()
+        self.a = rng.integers(-9, 9, (self.reference_rows, FFT_MULTIPLICATION_THRESHOLD)).astype(np.float64)
+        self.b = rng.integers(-9, 9, (self.reference_rows, FFT_MULTIPLICATION_THRESHOLD + 3)).astype(np.float64)
+        self.reference = np.array([np.convolve(a, b) for a, b in zip(self.a, self.b)])
+
+    def test_schoolbook_batch(self):
+        np.testing.assert_array_equal(self.reference, schoolbook_multiply_batch(self.a, self.b))
+
+    def test_fft_batch(self):
+        np.testing.assert_array_equal(self.reference, fft_multiply_batch(self.a, self.b))
+
+    def test_dispatch_batch(self):
+        np.testing.assert_array_equal(self.reference, multiply_batch(self.a, self.b))
+
+
+class TestMatmul(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(20)
+        width = FFT_MULTIPLICATION_THRESHOLD
+        self.a = rng.integers(-5, 6, (3, 4, width)).astype(float)
+        self.b = rng.integers(-5, 6, (4, 2, width)).astype(float)
+
+    def reference(self, a, b):
+        product = np.zeros((a.shape[0], b.shape[1], a.shape[2] + b.shape[2] - 1))
+        for i, j, k in np.ndindex(a.shape[0], b.shape[1], a.shape[1]):
+            product[i, j] += np.convolve(a[i, k], b[k, j])
+        return product
+
+    def test_implementations_agree(self):
+        reference = self.reference(self.a, self.b)
+        for implementation in (schoolbook_matmul, fft_matmul, convolve_matmul, matmul):
+            np.testing.assert_array_equal(reference, implementation(self.a, self.b))
+
+    def test_uneven_widths(self):
+        for a, b in ((self.a, self.b[:, :, :3]), (self.a[:, :, :3], self.b)):
+            np.testing.assert_array_equal(self.reference(a, b), schoolbook_matmul(a, b))
+
+
+class TestProductTree(unittest.TestCase):
+    def test_matches_sequential_product(self):
+        rng = np.random.default_rng()
+        factors = [rng.integers(-5, 5, rng.integers(1, 40)).astype(np.float64) for _ in range(7)]
+        reference = factors[0]
+        for factor in factors[1:]:
+            reference = np.convolve(reference, factor)
+        np.testing.assert_array_equal(reference, product_tree(factors))
+
+    def test_single_factor(self):
+        np.testing.assert_array_equal([1.0, 2.0], product_tree([np.array([1.0, 2.0])]))
+
+
+class TestFastDivision(unittest.TestCase):
+    def test_series_inverse(self):
+        f = np.array([2.0, 1.0, -3.0, 0.5])
+        inverse = series_inverse(f, 10)
+        product = np.convolve(f, inverse)[:10]
+        np.testing.assert_allclose(np.eye(1, 10)[0], product, atol=1e-9)
+
+    def test_matches_polydiv(self):
+        a = np.array([3.0, 1, 4, 1, 5, 9, 2, 6])
+        b = np.array([2.0, 7, 1, 8])
+        quotient, remainder = fast_divmod(a, b)
+        reference_quotient, reference_remainder = np.polydiv(a, b)
+        np.testing.assert_allclose(reference_quotient, quotient)
+        np.testing.assert_allclose(reference_remainder, remainder)
+
+    # Below the threshold, or for a divisor whose leading coefficient does not
+    # dominate, divide is long division; above it, a well-conditioned divisor
+    # takes the Newton path and never reaches np.polydiv
+    def test_divide_dispatch(self):
+        rng = np.random.default_rng(18)
+        for length in (FAST_DIVISION_THRESHOLD // 2, 2 * FAST_DIVISION_THRESHOLD):
+            a = rng.integers(-9, 10, 2 * length).astype(float)
+            b = rng.integers(-9, 10, length).astype(float)
+            b[0] = 0.5
+            self.assertFalse(is_well_conditioned(b))
+            quotient, remainder = divide(a, b)
+            reference_quotient, reference_remainder = np.polydiv(a, b)
+            np.testing.assert_array_equal(reference_quotient, quotient)
+            np.testing.assert_array_equal(reference_remainder, remainder)
+
+        length = 2 * FAST_DIVISION_THRESHOLD
+        a = rng.integers(-9, 10, 2 * length).astype(float)
+        b = rng.integers(-9, 10, length).astype(float)
+        b[0] = 10 * length
+        self.assertTrue(is_well_conditioned(b))
+        reference_quotient, reference_remainder = np.polydiv(a, b)
+        with mock.patch.object(np, "polydiv", side_effect=AssertionError("long division used")):
+            quotient, remainder = divide(a, b)
+        np.testing.assert_allclose(reference_quotient, quotient, rtol=1e-9, atol=1e-12)
+        np.testing.assert_allclose(reference_remainder, remainder, rtol=1e-9, atol=1e-9)
+
+    def test_inaccurate_division_is_detected(self):
+        a = np.array([3.0, 1, 4, 1, 5, 9, 2, 6])
+        b = np.array([2.0, 7, 1, 8])
+        quotient, remainder = np.polydiv(a, b)
+        self.assertTrue(division_is_accurate(a, b, quotient, remainder))
+        self.assertFalse(division_is_accurate(a, b, quotient * (1 + 1e-9), remainder))
+
+    # Ciphertexts of generated keys are long enough for the Newton path, but their
+    # leading coefficients do not dominate: whatever divide returns must restore
+    # the dividend at least as well as long division does
+    def test_divide_ciphertexts(self):
+        self.log = logging.getLogger("TestFastDivision")
+        for _ in range(10):
+            _, public_key = generate_abramov_keypair(10, FAST_DIVISION_THRESHOLD + 8)
+            a = (public_key.encrypt(37) * public_key.encrypt(12)).coefficients[::-1]
+            b = public_key.encrypt(57).coefficients[::-1]
+            quotient, remainder = divide(a, b)
+            reference_quotient, reference_remainder = np.polydiv(a, b)
+
+            residual = np.max(np.abs(np.polyadd(np.polymul(quotient, b), remainder) - a))
+            reference_residual = np.max(np.abs(np.polyadd(np.polymul(reference_quotient, b), reference_remainder) - a))
+            self.log.debug(f"\nResidual: {residual}, long division: {reference_residual}\n")
+            self.assertLessEqual(residual, max(reference_residual, len(a) * np.finfo(float).eps * np.max(np.abs(a))))
+
+
+if __name__ == '__main__':
+    # Change logging level from DEBUG to INFO to see less details
+    logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+    unittest.main(verbosity=2)
@@ -0,0 +1,137 @@
+import sys
+import unittest
+import logging
+from fractions import Fraction
+import numpy as np
+
+from homomorphic_polynomial_system.keygen import AbramovPrivateKey, AbramovPublicKey, generate_abramov_keypair
+from homomorphic_polynomial_system.vars import ROUND_TO_INT, REDUCE_ALWAYS, REDUCE_ABOVE_THRESHOLD, \
+    REDUCTION_EXACT_BOUND
+
+
+class TestReduction(unittest.TestCase):
+    reference_base = 7
+    reference_threshold = 20
+
+    # Fixed well-conditioned key: root -1/2, obfuscating multipliers without rational roots
+    def setUp(self):
+        self.log = logging.getLogger("TestReduction")
+        key_polynomial = np.poly1d([2, 1]) * np.poly1d([1, 0, 0, 0, 2]) * np.poly1d([3, 0, 5]) + self.reference_base
+        self.private_key = AbramovPrivateKey(-0.5)
+        self.public_key = AbramovPublicKey(self.reference_base, key_polynomial)
+        self.key_degree = key_polynomial.order
+
+    def test_manual_reduction(self):
+        product = self.public_key.encrypt(56) * self.public_key.encrypt(112)
+        with self.assertRaises(ValueError):
+            product.reduce()
+
+        self.public_key.set_reduction_policy()
+        product = self.public_key.encrypt(56) * self.public_key.encrypt(112)
+        reduced = product.reduce()
+
+        self.log.debug(f"\nDegree before reduction: {product.polynomial.order}\n")
+        self.log.debug(f"\nDegree after reduction: {reduced.polynomial.order}\n")
+
+        self.assertLess(reduced.polynomial.order, self.key_degree)
+        self.assertEqual(56 * 112, np.round(self.private_key.decrypt(reduced), ROUND_TO_INT))
+
+    def test_always_policy(self):
+        self.public_key.set_reduction_policy(REDUCE_ALWAYS)
+        encrypted_numbers = [self.public_key.encrypt(number) for number in (56, 112, 3, 56)]
+        product = encrypted_numbers[0]
+        for encrypted_number in encrypted_numbers[1:]:
+            product = product * encrypted_number
+            self.assertLess(product.polynomial.order, self.key_degree)
+        self.assertEqual(56 * 112 * 3 * 56, np.round(self.private_key.decrypt(product), ROUND_TO_INT))
+
+    def test_threshold_policy(self):
+        self.public_key.set_reduction_policy(REDUCE_ABOVE_THRESHOLD, self.reference_threshold)
+        a = self.public_key.encrypt(56)
+        b = self.public_key.encrypt(112)
+        self.assertLessEqual((a * b).polynomial.order, self.reference_threshold)
+        c = self.public_key.encrypt(10)
+        self.assertEqual(2 * self.key_degree, (c * c).polynomial.order)
+        self.assertEqual(56 + 112, np.round(self.private_key.decrypt(a + b), ROUND_TO_INT))
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            self.public_key.set_reduction_policy("sometimes")
+
+
+class TestReductionGeneratedKeys(unittest.TestCase):
+    reference_base = 10
+    reference_degree = 16
+    reference_key_count = 20
+
+    def setUp(self):
+        self.log = logging.getLogger("TestReductionGeneratedKeys")
+
+    # Exact value of ascending coefficients at the secret root; the root is the
+    # rational -c0 / c1 with both coefficients below 100, so it is recovered exactly
+    @staticmethod
+    def exact_value(coefficients, private_key) -> Fraction:
+        root = Fraction(private_key.get_root()).limit_denominator(100)
+        value = Fraction(0)
+        for coefficient in coefficients[::-1]:
+            value = value * root + Fraction(coefficient)
+        return value
+
+    # The remainder is exact, so reduction keeps the value under the key exactly;
+    # only products whose coefficients went past float64 precision are refused
+    def test_reduction_keeps_value(self):
+        for _ in range(self.reference_key_count):
+            private_key, public_key = generate_abramov_keypair(self.reference_base, self.reference_degree)
+            public_key.set_reduction_policy()
+            product = public_key.encrypt(300) * public_key.encrypt(20)
+            if np.abs(product.coefficients).max() >= REDUCTION_EXACT_BOUND:
+                continue
+            reduced = product.reduce()
+            self.assertLess(reduced.polynomial.order, public_key.get_polynomial().order)
+            self.assertEqual(self.exact_value(product.coefficients, private_key),
+                             self.exact_value(reduced.coefficients, private_key))
+
+class TestReductionHighDegree(unittest.TestCase):
+    reference_base = 10
+    reference_degree = 1000
+    reference_key_count = 3
+
+    @classmethod
+    def setUpClass(cls):
+        cls.keypairs = [generate_abramov_keypair(cls.reference_base, cls.reference_degree)
+                        for _ in range(cls.reference_key_count)]
+
+    def setUp(self):
+        self.log = logging.getLogger("TestReductionHighDegree")
+
+    # A fresh ciphertext is P(K) with exact coefficients, so its remainder
+    # modulo K - base is the constant P(base): the plaintext itself
+    def test_fresh_ciphertext_reduces_to_plaintext(self):
+        for private_key, public_key in self.keypairs:
+            public_key.set_reduction_policy()
+            reduced = public_key.encrypt(37).reduce()
+            self.assertEqual([37], list(reduced.coefficients))
+
+    # Products are reduced without changing their value under the key, unless
+    # their coefficients went past float64 precision: then policies leave them
+    # as they are and manual reduction raises
+    def test_always_policy_on_products(self):
+        for private_key, public_key in self.keypairs:
+            public_key.set_reduction_policy()
+            product = public_key.encrypt(300) * public_key.encrypt(20)
+            public_key.set_reduction_policy(REDUCE_ALWAYS)
+            reduced = public_key.encrypt(300) * public_key.encrypt(20)
+            self.log.debug(f"\nDegree of the product: {product.degree}, after the policy: {reduced.degree}\n")
+            if reduced.degree < public_key.get_polynomial().order:
+                exact_value = TestReductionGeneratedKeys.exact_value
+                self.assertEqual(exact_value(product.coefficients, private_key),
+                                 exact_value(reduced.coefficients, private_key))
+            else:
+                self.assertEqual(product.degree, reduced.degree)
+                with self.assertRaises(ValueError):
+                    reduced.reduce()
+
+if __name__ == '__main__':
+    # Change logging level from DEBUG to INFO to see less details
+    logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+    unittest.main(verbosity=2)
@@ -0,0 +1,63 @@
+import sys
+import unittest
+import logging
+import numpy as np
+
+from homomorphic_polynomial_system.rns import RNSPolynomial, generate_rns_keypair, reconstruct, to_residues
+
+
+class TestRNSPolynomial(unittest.TestCase):
+    def test_residue_round_trip(self):
+        values = [0, 1, -1, 2 ** 70, -(3 ** 50)]
+        residues = to_residues(np.array(values, dtype=object))
+        self.assertEqual(values, [reconstruct(column) for column in residues.T])
+
+    def test_multiplication_is_exact(self):
+        rng = np.random.default_rng()
+        a = rng.integers(-10 ** 6, 10 ** 6, 300)
+        b = rng.integers(-10 ** 6, 10 ** 6, 257)
+        reference = np.convolve(a.astype(object), b.astype(object)).tolist()
+        product = RNSPolynomial.from_coefficients(a) * RNSPolynomial.from_coefficients(b)
+        self.assertEqual(reference, product.get_coefficients())
+
+
+class TestRNSEncryption(unittest.TestCase):
+    reference_base = 7
+    reference_degree = 64
+
+    @classmethod
+    def setUpClass(cls):  # Keypair will be generated once for all these test cases
+        cls.log = logging.getLogger("TestRNSEncryption")
+        cls.private_key, cls.public_key = \
+            generate_rns_keypair(cls.reference_base, cls.reference_degree)
+
+        cls.test_number1 = 123456789
+        cls.test_number2 = -987654321
+        cls.encrypted_number1 = cls.public_key.encrypt(cls.test_number1)
+        cls.encrypted_number2 = cls.public_key.encrypt(cls.test_number2)
+
+    def test_decryption(self):
+        self.assertEqual(self.test_number1, self.private_key.decrypt(self.encrypted_number1))
+        self.assertEqual(self.test_number2, self.private_key.decrypt(self.encrypted_number2))
+
+    def test_key_polynomial_correctness(self):
+        key_polynomial = self.public_key.get_polynomial()
+        self.log.debug(f"\nKey polynomial length: {len(key_polynomial)}\n")
+        self.assertEqual(self.reference_degree + 2, len(key_polynomial))
+
+    def test_exact_arithmetic(self):
+        reference = self.test_number1 * self.test_number2 + self.test_number1 - self.test_number2
+        encrypted_result = self.encrypted_number1 * self.encrypted_number2 \
+            + self.encrypted_number1 - self.encrypted_number2
+        decrypted_result = self.private_key.decrypt(encrypted_result)
+
+        self.log.debug(f"\nReference result: {reference}\n")
+        self.log.debug(f"\nDecrypted result: {decrypted_result}\n")
+
+        self.assertEqual(reference, decrypted_result)
+
+
+if __name__ == '__main__':
+    # Change logging level from DEBUG to INFO to see less details
+    logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+    unittest.main(verbosity=2)
@@ -0,0 +1,93 @@
+import asyncio
+import sys
+import time
+import unittest
+import logging
+from unittest import mock
+
+import numpy as np
+
+from homomorphic_polynomial_system.keygen import generate_abramov_keypair
+from homomorphic_polynomial_system.service import BatchingCryptoService
+from homomorphic_polynomial_system.vars import ROUND_TO_INT
+
+
+class TestBatchingCryptoService(unittest.IsolatedAsyncioTestCase):
+    reference_base = 8
+    reference_degree = 4
+    reference_batch_size = 8
+
+    @classmethod
+    def setUpClass(cls):  # Keypair will be generated once for all these test cases
+        cls.log = logging.getLogger("TestBatchingCryptoService")
+        cls.private_key, cls.public_key = \
+            generate_abramov_keypair(cls.reference_base, cls.reference_degree)
+        cls.test_numbers = list(range(20))
+
+    async def test_round_trip(self):
+        async with BatchingCryptoService(self.public_key, self.private_key) as service:
+            encrypted_numbers = await asyncio.gather(*(service.encrypt(number) for number in self.test_numbers))
+            decrypted_numbers = await asyncio.gather(*(service.decrypt(number) for number in encrypted_numbers))
+        self.assertEqual(self.test_numbers, [np.round(number, ROUND_TO_INT) for number in decrypted_numbers])
+
+    async def test_requests_are_batched(self):
+        with mock.patch.object(self.public_key, "encrypt_many", wraps=self.public_key.encrypt_many) as encrypt_many:
+            async with BatchingCryptoService(self.public_key, max_batch_size=self.reference_batch_size,
+                                             max_latency=0.05) as service:
+                await asyncio.gather(*(service.encrypt(number) for number in self.test_numbers))
+
+        batch_sizes = [len(call.args[0]) for call in encrypt_many.call_args_list]
+        self.log.debug(f"\nBatch sizes: {batch_sizes}\n")
+        self.assertEqual(len(self.test_numbers), sum(batch_sizes))
+        self.assertLessEqual(max(batch_sizes), self.reference_batch_size)
+        self.assertLess(len(batch_sizes), len(self.test_numbers))
+
+    async def test_backpressure(self):
+        async with BatchingCryptoService(self.public_key, max_batch_size=2, max_queue_size=1) as service:
+            encrypted_numbers = await asyncio.gather(*(service.encrypt(number) for number in self.test_numbers))
+        self.assertEqual(len(self.test_numbers), len(encrypted_numbers))
+
+    async def test_errors_reach_callers(self):
+        async with BatchingCryptoService(private_key=self.private_key) as service:
+            with self.assertRaises(RuntimeError):
+                await service.encrypt(1)
+            with self.assertRaises(AttributeError):
+                await service.decrypt("not a ciphertext")
+            encrypted_number = self.public_key.encrypt(5)
+            self.assertEqual(5, np.round(await service.decrypt(encrypted_number), ROUND_TO_INT))
+
+    async def test_batch_error_fails_only_bad_request(self):
+        async with BatchingCryptoService(private_key=self.private_key, max_latency=0.05) as service:
+            requests = [self.public_key.encrypt(number) for number in (5, 6)]
+            results = await asyncio.gather(service.decrypt(requests[0]), service.decrypt("not a ciphertext"),
+                                           service.decrypt(requests[1]), return_exceptions=True)
+        self.log.debug(f"\nResults: {results}\n")
+        self.assertEqual(5, np.round(results[0], ROUND_TO_INT))
+        self.assertIsInstance(results[1], AttributeError)
+        self.assertEqual(6, np.round(results[2], ROUND_TO_INT))
+
+    # The first request is in the executor and the second one waits in the queue
+    # when the service stops: neither of them may be left hanging
+    async def test_stop_cancels_pending_requests(self):
+        encrypt_many = self.public_key.encrypt_many
+
+        def slow_encrypt_many(numbers):
+            time.sleep(0.2)
+            return encrypt_many(numbers)
+
+        with mock.patch.object(self.public_key, "encrypt_many", side_effect=slow_encrypt_many):
+            service = BatchingCryptoService(self.public_key, max_batch_size=1)
+            await service.start()
+            in_flight = asyncio.create_task(service.encrypt(1))
+            queued = asyncio.create_task(service.encrypt(2))
+            await asyncio.sleep(0.05)
+            await service.stop()
+            for request in (in_flight, queued):
+                with self.assertRaises(asyncio.CancelledError):
+                    await asyncio.wait_for(request, 1)
+
+
+if __name__ == '__main__':
+    # Change logging level from DEBUG to INFO to see less details
+    logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+    unittest.main(verbosity=2)
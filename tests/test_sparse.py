@@ -0,0 +1,84 @@
+import sys
+import unittest
+import logging
+import numpy as np
+
+from homomorphic_polynomial_system.keygen import generate_abramov_keypair, AbramovPublicKey
+from homomorphic_polynomial_system.sparse import SparsePolynomial, multiply, to_dense, evaluate, \
+    generate_sparse_obfuscating_multiplier
+
+
+class TestSparsePolynomial(unittest.TestCase):
+    reference_degree = 1000
+
+    def setUp(self):
+        self.log = logging.getLogger("TestSparsePolynomial")
+        self.a = SparsePolynomial([0, 10, self.reference_degree], [3, -2, 5])
+        self.b = SparsePolynomial([0, 7], [1, 4])
+
+    def test_dense_round_trip(self):
+        dense = self.a.to_dense()
+        self.assertEqual(self.reference_degree, np.poly1d(dense).order)
+        restored = SparsePolynomial.from_dense(dense)
+        np.testing.assert_array_equal(self.a.degrees, restored.degrees)
+        np.testing.assert_array_equal(self.a.values, restored.values)
+
+    def test_arithmetic_matches_poly1d(self):
+        a, b = self.a.to_poly1d(), self.b.to_poly1d()
+        self.assertEqual(a + b, (self.a + self.b).to_poly1d())
+        self.assertEqual(a - b, (self.a - self.b).to_poly1d())
+        product = self.a * self.b
+        self.assertIsInstance(product, SparsePolynomial)
+        self.assertEqual(a * b, product.to_poly1d())
+
+    def test_cancellation(self):
+        self.assertEqual(0, len(self.a - self.a))
+        self.assertEqual(np.poly1d(0), (self.a - self.a).to_poly1d())
+
+    def test_switches_to_dense(self):
+        filled = SparsePolynomial.from_dense(np.arange(1, 12))
+        product = multiply(filled, self.b)
+        self.assertIsInstance(product, np.ndarray)
+        np.testing.assert_array_equal(np.convolve(np.arange(1, 12), self.b.to_dense()), product)
+
+    def test_obfuscating_multiplier(self):
+        multiplier = generate_sparse_obfuscating_multiplier(self.reference_degree)
+        self.log.debug(f"\nSparse multiplier terms: {multiplier.degrees}, {multiplier.values}\n")
+        self.assertEqual(2, len(multiplier))
+        self.assertEqual(self.reference_degree, multiplier.get_degree())
+        self.assertEqual(0, np.poly1d(to_dense(generate_sparse_obfuscating_multiplier(0))).order)
+
+    def test_evaluate_stays_sparse(self):
+        digits = [4, 0, 2, 7]
+        result = evaluate(digits, self.a)
+        self.assertIsInstance(result, SparsePolynomial)
+        self.assertEqual(np.polyval(np.poly1d(digits), self.a.to_poly1d()), result.to_poly1d())
+        dense = evaluate(digits, np.arange(1.0, 12.0))
+        self.assertIsInstance(dense, np.ndarray)
+        self.assertEqual(np.polyval(np.poly1d(digits), np.poly1d(np.arange(1.0, 12.0))), np.poly1d(dense))
+
+    # Generated keys of high degree are often a few binomials multiplied out;
+    # their ciphertexts may fill in, but must match dense evaluation either way
+    def test_sparse_encryption(self):
+        _, public_key = generate_abramov_keypair(10, 20 * self.reference_degree)
+        encrypted_number = public_key.encrypt(4321)
+        reference = np.polyval(public_key.encode(4321), public_key.get_polynomial())
+        self.log.debug(f"\nZero coefficients: {np.mean(encrypted_number.coefficients == 0)}\n")
+        np.testing.assert_allclose(reference.coef[::-1], encrypted_number.coefficients,
+                                   rtol=1e-12, atol=1e-12 * np.max(np.abs(reference.coef)))
+
+
+    # A sparse key is the only copy of the key; its dense forms are built on demand
+    def test_sparse_key_dense_forms(self):
+        public_key = AbramovPublicKey(10, self.a)
+        np.testing.assert_array_equal(self.a.to_dense(), public_key.get_polynomial().coef)
+        reducer = public_key.get_reducer()
+        self.assertEqual(self.reference_degree, reducer.get_degree())
+        remainder = reducer.reduce_coefficients(public_key.encrypt(37).coefficients)
+        np.testing.assert_array_equal([37], np.trim_zeros(remainder, 'b'))
+
+
+if __name__ == '__main__':
+    # Change logging level from DEBUG to INFO to see less details
+    logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+    unittest.main(verbosity=2)
@@ -0,0 +1,83 @@
+import os
+import sys
+import tempfile
+import unittest
+import logging
+import numpy as np
+
+from homomorphic_polynomial_system.keygen import generate_abramov_keypair
+from homomorphic_polynomial_system.store import CiphertextStore
+from homomorphic_polynomial_system.vars import ROUND_TO_INT
+
+
+class TestCiphertextStore(unittest.TestCase):
+    reference_base = 8
+    reference_degree = 4
+    reference_width = 16
+
+    @classmethod
+    def setUpClass(cls):  # Keypair will be generated once for all these test cases
+        cls.log = logging.getLogger("TestCiphertextStore")
+        cls.private_key, cls.public_key = \
+            generate_abramov_keypair(cls.reference_base, cls.reference_degree)
+        cls.test_numbers = [3, 1, 0, 42, 7, 19, 5, 63, 12, 30]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "ciphertexts.hpsc")
+        self.store = CiphertextStore(self.path, self.reference_width)
+        self.store.append(self.public_key.encrypt_many(self.test_numbers[:4]))
+        for number in self.test_numbers[4:]:
+            self.store.append(self.public_key.encrypt(number))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_reopen(self):
+        reopened = CiphertextStore(self.path)
+        self.assertEqual(len(self.test_numbers), len(reopened))
+        self.assertEqual(self.reference_width, reopened.get_width())
+        decrypted_numbers = self.private_key.decrypt_many([number for number in reopened])
+        self.assertEqual(self.test_numbers, list(np.round(decrypted_numbers, ROUND_TO_INT)))
+
+    def test_chunks(self):
+        chunk_lengths = [len(chunk) for chunk in self.store.iter_chunks(chunk_size=3)]
+        self.assertEqual([3, 3, 3, 1], chunk_lengths)
+
+    def test_streaming_sum(self):
+        encrypted_sum = self.store.sum(chunk_size=3)
+        self.assertEqual(sum(self.test_numbers), np.round(self.private_key.decrypt(encrypted_sum), ROUND_TO_INT))
+
+    def test_streaming_dot(self):
+        weights = np.arange(len(self.test_numbers))
+        encrypted_dot = self.store.dot(weights, chunk_size=4)
+        self.assertEqual(int(weights @ self.test_numbers),
+                         np.round(self.private_key.decrypt(encrypted_dot), ROUND_TO_INT))
+
+    def test_count(self):
+        self.assertEqual(len(self.test_numbers), self.store.count())
+
+    def test_compact_dtype(self):
+        self.assertEqual("i", self.store.get_dtype().kind)
+        self.assertLess(os.path.getsize(self.path), len(self.test_numbers) * self.reference_width * 8)
+
+    def test_widening(self):
+        dtype = self.store.get_dtype()
+        fraction = self.public_key.encrypt(3) * self.public_key.encrypt(5)
+        fraction.polynomial = fraction.polynomial / 2
+        self.store.append(fraction)
+        reopened = CiphertextStore(self.path)
+        self.assertEqual(np.float64, reopened.get_dtype())
+        self.assertNotEqual(dtype, reopened.get_dtype())
+        decrypted_numbers = self.private_key.decrypt_many([number for number in reopened])
+        self.assertEqual(self.test_numbers + [7.5], list(np.round(decrypted_numbers, 6)))
+
+    def test_rejects_wide_ciphertext(self):
+        with self.assertRaises(ValueError):
+            self.store.append(self.public_key.encrypt(8 ** 5))
+
+
+if __name__ == '__main__':
+    # Change logging level from DEBUG to INFO to see less details
+    logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+    unittest.main(verbosity=2)
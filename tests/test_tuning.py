@@ -0,0 +1,71 @@
+import json
+import os
+import platform
+import sys
+import tempfile
+import unittest
+import logging
+
+from homomorphic_polynomial_system import polymath, tuning
+
+
+class TestTuning(unittest.TestCase):
+    reference_sizes = (16, 32, 64)
+
+    def setUp(self):
+        self.log = logging.getLogger("TestTuning")
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "nested", "multiplication.json")
+
+    def tearDown(self):
+        polymath.reset_thresholds()
+        self.directory.cleanup()
+
+    def test_calibrate(self):
+        thresholds = tuning.calibrate(self.reference_sizes, repeat=2, min_time=0.0001)
+        self.log.debug(f"\nCalibrated thresholds: {thresholds}\n")
+        self.assertEqual(set(self.reference_sizes), set(thresholds["timings"]))
+        for name in ("karatsuba", "fft"):
+            self.assertIn(thresholds[name], self.reference_sizes + (2 * self.reference_sizes[-1],))
+
+    def test_crossover(self):
+        sizes = [8, 16, 32, 64]
+        self.assertEqual(32, tuning._crossover(sizes, lambda size: size >= 32))
+        self.assertEqual(64, tuning._crossover(sizes, lambda size: size in (8, 64)))
+        self.assertEqual(128, tuning._crossover(sizes, lambda size: False))
+
+    def test_save_and_load(self):
+        tuning.save_thresholds({"karatsuba": 96, "fft": 48}, self.path)
+        with open(self.path) as file:
+            cache = json.load(file)
+        self.assertEqual(96, cache[platform.node()]["karatsuba"])
+
+        self.assertTrue(polymath.load_thresholds(self.path))
+        self.assertEqual({"karatsuba": 96, "fft": 48}, polymath.get_thresholds())
+
+    def test_tune_applies_thresholds(self):
+        thresholds = tuning.tune(self.path, self.reference_sizes, repeat=2, min_time=0.0001)
+        self.assertEqual(thresholds["fft"], polymath.get_thresholds()["fft"])
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_other_hosts_are_kept(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w") as file:
+            json.dump({"other-host": {"karatsuba": 1, "fft": 1}}, file)
+        self.assertFalse(polymath.load_thresholds(self.path))
+        tuning.save_thresholds({"karatsuba": 96, "fft": 48}, self.path)
+        with open(self.path) as file:
+            self.assertEqual({"other-host", platform.node()}, set(json.load(file)))
+
+    def test_broken_cache_is_ignored(self):
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w") as file:
+            file.write("{not json")
+        self.assertFalse(polymath.load_thresholds(self.path))
+        self.assertFalse(polymath.load_thresholds(os.path.join(self.directory.name, "missing.json")))
+
+
+if __name__ == '__main__':
+    # Change logging level from DEBUG to INFO to see less details
+    logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+    unittest.main(verbosity=2)
@@ -0,0 +1,130 @@
+import os
+import struct
+import sys
+import tempfile
+import unittest
+import logging
+import numpy as np
+
+from homomorphic_polynomial_system.enc_vec import EncryptedVector
+from homomorphic_polynomial_system.keygen import generate_abramov_keypair
+from homomorphic_polynomial_system.wire import pack, unpack, dump, load, read_header, compact_dtype, Header, \
+    HEADER_SIZE, FLAG_ZERO_RUNS
+
+
+class TestWireFormat(unittest.TestCase):
+    reference_base = 8
+    reference_degree = 4
+
+    @classmethod
+    def setUpClass(cls):  # Keypair will be generated once for all these test cases
+        cls.log = logging.getLogger("TestWireFormat")
+        cls.private_key, cls.public_key = \
+            generate_abramov_keypair(cls.reference_base, cls.reference_degree)
+        cls.test_numbers = [0, 1, 197, 42, 7]
+        cls.encrypted_vector = cls.public_key.encrypt_many(cls.test_numbers)
+
+    def test_header(self):
+        header = read_header(pack(self.encrypted_vector))
+        self.log.debug(f"\nHeader: {header}\n")
+        self.assertEqual(len(self.test_numbers), header.count)
+        self.assertEqual(self.encrypted_vector.get_width(), header.width)
+        self.assertEqual(compact_dtype(self.encrypted_vector.coefficients), header.dtype)
+        self.assertEqual("i", header.dtype.kind)
+
+    def test_round_trip(self):
+        buffer = pack(self.encrypted_vector)
+        restored = unpack(buffer)
+        itemsize = restored.coefficients.dtype.itemsize
+        self.assertEqual(HEADER_SIZE + self.encrypted_vector.coefficients.size * itemsize, len(buffer))
+        self.assertLess(len(buffer), len(pack(self.encrypted_vector, dtype=np.float64)))
+        np.testing.assert_array_equal(self.encrypted_vector.coefficients, restored.coefficients)
+
+    def test_unpack_is_zero_copy(self):
+        buffer = bytearray(pack(self.encrypted_vector))
+        restored = unpack(buffer)
+        value = np.array(123, dtype=restored.coefficients.dtype)
+        buffer[HEADER_SIZE:HEADER_SIZE + value.nbytes] = value.tobytes()
+        self.assertEqual(123, restored.coefficients[0, 0])
+
+    def test_zero_run_compression(self):
+        buffer = pack(self.encrypted_vector, compress=True)
+        raw_size = len(pack(self.encrypted_vector))
+        self.log.debug(f"\nCompressed size: {len(buffer)}, raw size: {raw_size}\n")
+        self.assertLess(len(buffer), raw_size)
+        self.assertTrue(read_header(buffer).flags & FLAG_ZERO_RUNS)
+        np.testing.assert_array_equal(self.encrypted_vector.coefficients, unpack(buffer).coefficients)
+        restored = unpack(pack(self.encrypted_vector, compress=True, dtype=np.float64))
+        np.testing.assert_array_equal(self.encrypted_vector.coefficients, restored.coefficients)
+
+    # Constant ciphertexts of mixed zeros and ones leave nothing to compress
+    def test_incompressible_data_is_sent_raw(self):
+        flags = EncryptedVector(np.resize([0.0, 1.0, 1.0], 1000).reshape(-1, 1))
+        buffer = pack(flags, compress=True)
+        self.assertEqual(len(pack(flags)), len(buffer))
+        self.assertEqual(0, read_header(buffer).flags)
+        np.testing.assert_array_equal(flags.coefficients, unpack(buffer).coefficients)
+
+    # Buffers written before run headers were narrowed still unpack
+    def test_version_1_compressed_buffer(self):
+        coefficients = np.array([[0, 0, 3, 0], [5, 0, 0, 0]], dtype=np.int8)
+        runs = np.array([[2, 1], [1, 1]], dtype="<i8")
+        header = Header(1, np.dtype(np.int8), FLAG_ZERO_RUNS, 4, 2)
+        buffer = header.pack() + struct.pack("<Q", 2) + runs.tobytes() + np.array([3, 5], dtype=np.int8).tobytes()
+        np.testing.assert_array_equal(coefficients, unpack(buffer).coefficients)
+
+    def test_compact_dtype(self):
+        self.assertEqual(np.int8, compact_dtype(np.array([-128.0, 127.0])))
+        self.assertEqual(np.int16, compact_dtype(np.array([0.0, 128.0])))
+        self.assertEqual(np.int32, compact_dtype(np.array([-2.0 ** 31, 1.0])))
+        self.assertEqual(np.int64, compact_dtype(np.array([2.0 ** 40])))
+        self.assertEqual(np.float64, compact_dtype(np.array([2.0 ** 63])))
+        self.assertEqual(np.float64, compact_dtype(np.array([0.5, 1.0])))
+
+    def test_explicit_dtype(self):
+        restored = unpack(pack(self.encrypted_vector, dtype=np.float64))
+        self.assertEqual(np.float64, restored.coefficients.dtype)
+        with self.assertRaises(ValueError):
+            pack(self.encrypted_vector * self.encrypted_vector * self.encrypted_vector, dtype=np.int8)
+        with self.assertRaises(ValueError):
+            pack(self.encrypted_vector, dtype=np.float32)
+
+    def test_arithmetic_widens(self):
+        restored = unpack(pack(self.encrypted_vector))
+        doubled = restored + restored
+        product = restored * restored
+        self.assertEqual(np.float64, doubled.coefficients.dtype)
+        self.assertEqual(np.float64, restored.sum().coefficients.dtype)
+        np.testing.assert_array_equal((self.encrypted_vector + self.encrypted_vector).coefficients,
+                                      doubled.coefficients)
+        reference = self.encrypted_vector * self.encrypted_vector
+        np.testing.assert_array_equal(reference.coefficients, product.coefficients)
+
+    def test_encrypted_number_list(self):
+        encrypted_numbers = self.encrypted_vector.to_list()
+        restored = unpack(pack(encrypted_numbers)).to_list()
+        for number, restored_number in zip(encrypted_numbers, restored):
+            self.assertEqual(number.polynomial, restored_number.polynomial)
+
+    def test_empty_vector(self):
+        empty = EncryptedVector(np.zeros((0, 1)))
+        self.assertEqual(0, len(unpack(pack(empty))))
+        self.assertEqual(0, len(unpack(pack(empty, compress=True))))
+
+    def test_file_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "ciphertexts.hpsc")
+            dump(self.encrypted_vector, path, compress=True)
+            restored = load(path)
+            np.testing.assert_array_equal(self.encrypted_vector.coefficients, restored.coefficients)
+            del restored
+
+    def test_rejects_foreign_buffer(self):
+        with self.assertRaises(ValueError):
+            unpack(b"\0" * HEADER_SIZE)
+
+
+if __name__ == '__main__':
+    # Change logging level from DEBUG to INFO to see less details
+    logging.basicConfig(stream=sys.stderr, level=logging.DEBUG)
+    unittest.main(verbosity=2)